@@ -0,0 +1,239 @@
+"""
+Measures the orchestration overhead of foundrydeploy: start-up, `Deployer.path`, re-runs against the
+cache, `plan` and `_handle_arg`, with stand-in `forge`/`cast` executables (see `fake_foundry.py`) on PATH.
+
+Everything runs in a temporary folder holding a synthetic `out/` tree of `--contracts` artifacts and the cache.
+
+Example:
+    python bench/bench.py --contracts 200 --actions 400 --latency 0.05 --workers 8
+    python bench/bench.py --async --workers 32 --json bench.jsonl
+"""
+import argparse, asyncio, contextlib, json, os, resource, shutil, subprocess, sys, tempfile, time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from foundrydeploy import AsyncDeployer, Deployer, Network, TEST_SIGNER
+
+
+###########################
+# Synthetic project
+###########################
+
+
+def write_artifacts(root: str, contracts: int, functions: int, padding: int) -> list:
+    """
+    Writes `out/C{i}.sol/C{i}.json` artifacts with `functions` functions and `padding` KB of bytecode
+    (placed before the abi, like `forge build` output), and returns their contract paths.
+    """
+    abi = [
+        {
+            "type": "function",
+            "name": f"fn{k}",
+            "inputs": [{"name": "a", "type": "uint256"}, {"name": "b", "type": "address"}],
+            "outputs": [],
+            "stateMutability": "nonpayable",
+        }
+        for k in range(functions)
+    ]
+    bytecode = "0x" + "60" * (padding * 512)
+
+    contract_paths = []
+    for i in range(contracts):
+        folder = os.path.join(root, "out", f"C{i}.sol")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"C{i}.json"), "w") as f:
+            json.dump({"bytecode": {"object": bytecode}, "abi": abi}, f)
+        contract_paths.append(f"src/C{i}.sol:C{i}")
+
+    return contract_paths
+
+
+def write_shims(root: str) -> str:
+    """
+    Puts `forge` and `cast` wrappers around `fake_foundry.py` in `root/bin`.
+    """
+    bin_dir = os.path.join(root, "bin")
+    os.makedirs(bin_dir, exist_ok=True)
+    for tool in ("forge", "cast"):
+        path = os.path.join(bin_dir, tool)
+        with open(path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{BENCH_DIR}/fake_foundry.py" {tool} "$@"\n')
+        os.chmod(path, 0o755)
+    return bin_dir
+
+
+def build_path(contract_paths: list, actions: int, functions: int) -> tuple:
+    """
+    Returns `(contracts, path)`: half the actions deploy a new label (all but the first depending on
+    `$L0`), the other half send to one of them.
+    """
+    deploys = max(1, actions // 2)
+    contracts = [(f"L{j}", contract_paths[j % len(contract_paths)]) for j in range(deploys)]
+
+    path = [(Deployer.DEPLOY, "L0", ["1"])]
+    path += [(Deployer.DEPLOY, f"L{j}", ["$L0", str(j)]) for j in range(1, deploys)]
+    path += [
+        (Deployer.SEND, f"L{j % deploys}", [f"fn{j % functions}", str(j), "$L0"])
+        for j in range(actions - deploys)
+    ]
+    return contracts, path
+
+
+###########################
+# Measurements
+###########################
+
+
+@contextlib.contextmanager
+def quiet():
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    with quiet():
+        fn()
+    return time.perf_counter() - start
+
+
+def peak_rss() -> tuple:
+    """
+    Peak resident set size in MB of this process and of its largest child.
+    """
+    scale = 1 if sys.platform == "darwin" else 1024
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 2**20,
+    )
+
+
+def spawn_baseline(runs: int = 10) -> float:
+    """
+    Average cost of spawning the fake `cast` with no latency, ie. the floor of every action.
+    """
+    env = dict(os.environ, FAKE_CAST_LATENCY="0")
+    start = time.perf_counter()
+    for _ in range(runs):
+        subprocess.run(["cast", "send"], env=env, stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) / runs
+
+
+def run_bench(args) -> dict:
+    root = tempfile.mkdtemp(prefix="foundrydeploy-bench-")
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        return _run_bench(args, root)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _run_bench(args, root: str) -> dict:
+    os.environ["PATH"] = write_shims(root) + os.pathsep + os.environ["PATH"]
+    os.environ["FAKE_FORGE_LATENCY"] = str(args.latency)
+    os.environ["FAKE_CAST_LATENCY"] = str(args.latency)
+    os.environ["FAKE_FOUNDRY_NOISE"] = str(args.noise)
+
+    contract_paths = write_artifacts(root, args.contracts, args.functions, args.padding)
+    contracts, path = build_path(contract_paths, args.actions, args.functions)
+    deployer_class = AsyncDeployer if args.use_async else Deployer
+
+    def new_deployer():
+        kwargs = {"concurrency": args.workers} if args.use_async else {}
+        return deployer_class(
+            Network.LOCAL, TEST_SIGNER, contracts, is_legacy=True, cache_path=root + "/cache", **kwargs
+        )
+
+    def load_signatures(deployer):
+        for label, _ in contracts:
+            deployer.signatures(label)
+
+    def run_path(deployer):
+        if args.use_async:
+            asyncio.run(deployer.path(path))
+        else:
+            deployer.path(path, workers=args.workers)
+
+    results = {"config": vars(args).copy(), "spawn_s": spawn_baseline()}
+
+    # Start-up: empty cache (every artifact parsed), then warm (artifact index hit)
+    holder = {}
+    results["startup_cold_s"] = timed(lambda: holder.update(d=new_deployer()))
+    results["signatures_cold_s"] = timed(lambda: load_signatures(holder["d"]))
+    with quiet():
+        holder["d"].save()
+    results["startup_warm_s"] = timed(lambda: holder.update(d=new_deployer()))
+    results["signatures_warm_s"] = timed(lambda: load_signatures(holder["d"]))
+
+    # Full run, every action spawns a shim
+    results["path_s"] = timed(lambda: run_path(holder["d"]))
+    results["path_actions_per_s"] = len(path) / results["path_s"]
+
+    # Re-run, every action is skipped from the cache
+    with quiet():
+        deployer = new_deployer()
+    results["plan_s"] = timed(lambda: deployer.plan(path))
+    results["rerun_s"] = timed(lambda: run_path(deployer))
+    results["rerun_actions_per_s"] = len(path) / results["rerun_s"]
+
+    # Argument resolution
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        deployer._handle_arg("$L0")
+        deployer._handle_arg("1000")
+    results["handle_arg_per_s"] = 2 * n / (time.perf_counter() - start)
+
+    results["peak_rss_mb"], results["peak_child_rss_mb"] = peak_rss()
+    return results
+
+
+def report(results: dict):
+    config = results["config"]
+    print(
+        f"# {config['contracts']} contracts, {config['actions']} actions, "
+        f"{config['latency']}s latency, workers={config['workers']}, async={config['use_async']}"
+    )
+    rows = [
+        ("spawn (no latency)", f"{results['spawn_s'] * 1000:.1f} ms"),
+        ("start-up, cold cache", f"{results['startup_cold_s'] * 1000:.1f} ms"),
+        ("signatures, cold", f"{results['signatures_cold_s'] * 1000:.1f} ms"),
+        ("start-up, warm cache", f"{results['startup_warm_s'] * 1000:.1f} ms"),
+        ("signatures, warm", f"{results['signatures_warm_s'] * 1000:.1f} ms"),
+        ("path", f"{results['path_s']:.2f} s ({results['path_actions_per_s']:.1f} actions/s)"),
+        ("plan", f"{results['plan_s'] * 1000:.1f} ms"),
+        ("re-run", f"{results['rerun_s'] * 1000:.1f} ms ({results['rerun_actions_per_s']:.0f} actions/s)"),
+        ("_handle_arg", f"{results['handle_arg_per_s']:.0f} calls/s"),
+        ("peak RSS", f"{results['peak_rss_mb']:.1f} MB (largest child {results['peak_child_rss_mb']:.1f} MB)"),
+    ]
+    for name, value in rows:
+        print(f"{name:<22} | {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=50, help="artifacts in the synthetic out/")
+    parser.add_argument("--functions", type=int, default=20, help="functions per artifact")
+    parser.add_argument("--padding", type=int, default=64, help="KB of bytecode per artifact")
+    parser.add_argument("--actions", type=int, default=100, help="actions in the path")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per forge/cast call")
+    parser.add_argument("--noise", type=int, default=0, help="extra output lines per forge/cast call")
+    parser.add_argument("--workers", type=int, default=1, help="path workers (async: concurrency)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="use AsyncDeployer")
+    parser.add_argument("--json", help="append the results as a JSON line to this file")
+    args = parser.parse_args()
+
+    results = run_bench(args)
+    report(results)
+
+    if args.json:
+        results["time"] = time.time()
+        with open(args.json, "a") as f:
+            f.write(json.dumps(results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
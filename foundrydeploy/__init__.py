@@ -22,6 +22,12 @@ class Signer:
     def get(self) -> str:
         return f"{self.key_kind} {self.key_argument}"
 
+    def args(self) -> list:
+        """
+        `get` as command line arguments.
+        """
+        return [self.key_kind, self.key_argument] if self.key_argument else [self.key_kind]
+
     def pub(self) -> str:
         return self.pub
 
@@ -32,4 +38,8 @@ TEST_SIGNER = Signer(
     "4f3edf983ac636a65a842ce7c78d9aa706d3b113bce9c46f30d7d21715b23b1d",
 )
 
-from .deploy import *
+from .deployer import *
+from .asyncdeployer import AsyncDeployer
+from .fanout import MultiDeployer
+from .process import Cancelled
+from .rpc import RpcBackend, RpcClient, RpcError
@@ -0,0 +1,207 @@
+"""
+ABI encoding of `cast`-style string arguments (eg. "1ether", "0x..", "[1,2]", "(1,0x..)").
+"""
+from decimal import Decimal
+from .eth import keccak256, to_bytes
+
+# Longest first, so "1gwei" isn't read as "1g" wei
+UNITS = [
+    ("ether", 10**18),
+    ("gwei", 10**9),
+    ("wei", 1),
+]
+
+
+###########################
+# Parsing
+###########################
+
+
+def split_top_level(value: str) -> list:
+    """
+    Splits on commas that are not nested inside brackets or parentheses.
+    """
+    parts = []
+    depth = 0
+    current = ""
+    for char in value:
+        if char in "[(":
+            depth += 1
+        elif char in "])":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += char
+
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def parse_signature(signature: str) -> tuple:
+    """
+    "functionName(uint256,bytes32)" -> ("functionName", ["uint256", "bytes32"])
+    """
+    name, _, inputs = signature.partition("(")
+    return name.strip(), split_top_level(inputs[:-1])
+
+
+def parse_int(value) -> int:
+    """
+    Parses integers the way `cast` does: decimal, hex (`0x..`) or with a unit suffix (`1ether`, `1.5gwei`).
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+
+    value = value.strip().lower()
+    for unit, multiplier in UNITS:
+        if value.endswith(unit):
+            return int(Decimal(value[: -len(unit)].strip()) * multiplier)
+
+    if value.startswith("0x") or value.startswith("-0x"):
+        return int(value, 16)
+    return int(value)
+
+
+def _parse_list(value) -> list:
+    if isinstance(value, (list, tuple)):
+        return list(value)
+
+    value = value.strip()
+    if value[0] in "[(" and value[-1] in "])":
+        value = value[1:-1]
+    return [v.strip('"') for v in split_top_level(value)]
+
+
+def _array_type(abi_type: str) -> tuple:
+    """
+    "uint256[2][]" -> ("uint256[2]", None), "uint256[2]" -> ("uint256", 2)
+    """
+    index = abi_type.rindex("[")
+    length = abi_type[index + 1 : -1]
+    return abi_type[:index], int(length) if length else None
+
+
+def _tuple_types(abi_type: str) -> list:
+    return split_top_level(abi_type[1:-1])
+
+
+def is_dynamic(abi_type: str) -> bool:
+    if abi_type in ("string", "bytes"):
+        return True
+    if abi_type.endswith("]"):
+        inner, length = _array_type(abi_type)
+        return length is None or is_dynamic(inner)
+    if abi_type.startswith("("):
+        return any(is_dynamic(t) for t in _tuple_types(abi_type))
+    return False
+
+
+###########################
+# Encoding
+###########################
+
+
+def _pad_right(data: bytes) -> bytes:
+    return data + b"\x00" * (-len(data) % 32)
+
+
+def _in_range(abi_type: str, number: int, low: int, high: int) -> int:
+    if not low <= number < high:
+        raise ValueError(f"{number} does not fit in {abi_type}")
+    return number
+
+
+def encode_single(abi_type: str, value) -> bytes:
+    if abi_type.endswith("]"):
+        inner, length = _array_type(abi_type)
+        values = _parse_list(value)
+        encoded = encode([inner] * len(values), values)
+        if length is None:
+            return len(values).to_bytes(32, "big") + encoded
+        return encoded
+
+    if abi_type.startswith("("):
+        return encode(_tuple_types(abi_type), _parse_list(value))
+
+    if abi_type.startswith("uint"):
+        number = _in_range(abi_type, parse_int(value), 0, 2 ** int(abi_type[4:] or 256))
+        return number.to_bytes(32, "big")
+
+    if abi_type.startswith("int"):
+        bits = int(abi_type[3:] or 256)
+        number = _in_range(abi_type, parse_int(value), -(2 ** (bits - 1)), 2 ** (bits - 1))
+        return number.to_bytes(32, "big", signed=True)
+
+    if abi_type == "address":
+        data = to_bytes(value) if isinstance(value, str) else value
+        if len(data) != 20:
+            raise ValueError(f"{value} is not an address")
+        return data.rjust(32, b"\x00")
+
+    if abi_type == "bool":
+        if isinstance(value, str):
+            value = value.strip().lower() in ("true", "1")
+        return int(bool(value)).to_bytes(32, "big")
+
+    if abi_type == "string":
+        data = value.encode() if isinstance(value, str) else value
+        return len(data).to_bytes(32, "big") + _pad_right(data)
+
+    if abi_type == "bytes":
+        data = to_bytes(value) if isinstance(value, str) else value
+        return len(data).to_bytes(32, "big") + _pad_right(data)
+
+    if abi_type.startswith("bytes"):
+        data = to_bytes(value) if isinstance(value, str) else value
+        if len(data) > int(abi_type[5:]):
+            raise ValueError(f"{value} does not fit in {abi_type}")
+        return _pad_right(data)
+
+    raise ValueError(f"unsupported ABI type: {abi_type}")
+
+
+def encode(types: list, values: list) -> bytes:
+    """
+    Encodes `values` as a tuple of `types` (head/tail layout).
+    """
+    if len(types) != len(values):
+        raise ValueError(f"expected {len(types)} arguments, got {len(values)}")
+
+    heads = []
+    tails = []
+    for abi_type, value in zip(types, values):
+        encoded = encode_single(abi_type, value)
+        if is_dynamic(abi_type):
+            heads.append(None)
+            tails.append(encoded)
+        else:
+            heads.append(encoded)
+            tails.append(b"")
+
+    offset = sum(32 if head is None else len(head) for head in heads)
+    result = b""
+    for index, head in enumerate(heads):
+        if head is None:
+            result += offset.to_bytes(32, "big")
+            offset += len(tails[index])
+        else:
+            result += head
+
+    return result + b"".join(tails)
+
+
+def selector(signature: str) -> bytes:
+    return keccak256(signature.replace(" ", "").encode())[:4]
+
+
+def encode_call(signature: str, args: list) -> bytes:
+    """
+    Calldata for `signature` called with `args`.
+    """
+    _, types = parse_signature(signature)
+    return selector(signature) + encode(types, args)
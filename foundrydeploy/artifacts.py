@@ -0,0 +1,291 @@
+import hashlib, json, os, re, threading
+
+CHUNK_SIZE = 1 << 16
+
+# Prefixes the digests of indexed artifacts. Bumped when `function_signatures` changes, so that signatures
+# indexed before are parsed again
+INDEX_VERSION = "2:"
+
+
+def artifact_path(contract_path: str, out: str = "out") -> str:
+    """
+    "src/Contract1.sol:ContractName1" -> "out/Contract1.sol/ContractName1.json"
+    """
+    contract_file_path, contract_name = contract_path.split(":")
+
+    for chunk in contract_file_path.split("/"):
+        if chunk.endswith(".sol"):
+            return f"{out}/{chunk}/{contract_name}.json"
+
+    raise ValueError(f"{contract_path} has no .sol file")
+
+
+def input_type(inp: dict) -> str:
+    """
+    Canonical type of an ABI input. Structs are tuples of their components:
+    {"type": "tuple[]", "components": [{"type": "uint256"}, {"type": "address"}]} -> "(uint256,address)[]"
+    """
+    abi_type = inp["type"]
+    if abi_type.startswith("tuple"):
+        components = ",".join(input_type(component) for component in inp["components"])
+        return f"({components}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+def function_signatures(abi: list) -> dict:
+    """
+    Maps every function name in the ABI to its signature, eg. {"transfer": "transfer(address,uint256)"}
+    """
+    signatures = {}
+    for obj in abi:
+        if obj["type"] == "function":
+
+            # Get inputs
+            inputs = []
+            for inp in obj["inputs"]:
+                inputs.append(input_type(inp))
+            inputs = ",".join(inputs)
+
+            # Get Name
+            func_name = obj["name"]
+            signatures[func_name] = "{}({})".format(func_name, inputs)
+
+    return signatures
+
+
+###########################
+# Streaming extraction
+###########################
+
+_WHITESPACE = re.compile(rb"\S")
+_STRING_STOP = re.compile(rb'["\\]')
+# A complete string, a bracket, or the opening quote of a string that continues past the buffer
+_NESTED_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]|"')
+_PRIMITIVE_STOP = re.compile(rb"[,}\]\s]")
+_QUOTE = ord('"')
+_OPENING = b"{["
+
+
+class _Scanner:
+    """
+    Walks a JSON document read in chunks, keeping only the bytes of the value being captured in memory.
+    """
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = b""
+        self.pos = 0
+        self.mark = None
+
+    def _fill(self) -> bool:
+        keep = min(self.pos if self.mark is None else self.mark, len(self.buf))
+        if self.mark is not None:
+            self.mark -= keep
+        self.buf = self.buf[keep:]
+        self.pos -= keep
+
+        chunk = self.f.read(self.chunk_size)
+        self.buf += chunk
+        return bool(chunk)
+
+    def _search(self, pattern) -> int:
+        """
+        Moves to the next byte matching `pattern` and returns it.
+        """
+        while True:
+            match = pattern.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self._fill():
+                raise ValueError("unexpected end of JSON")
+
+    def next_char(self) -> int:
+        return self._search(_WHITESPACE)
+
+    def expect(self, char: bytes):
+        if self.next_char() != char[0]:
+            raise ValueError(f"expected {char} at {self.pos}")
+        self.pos += 1
+
+    def skip_string(self):
+        self.pos += 1
+        while True:
+            if self._search(_STRING_STOP) == _QUOTE:
+                self.pos += 1
+                return
+            # Escaped char
+            self.pos += 2
+            while self.pos > len(self.buf):
+                if not self._fill():
+                    raise ValueError("unexpected end of JSON")
+
+    def read_string(self) -> str:
+        self.mark = self.pos
+        self.skip_string()
+        value = json.loads(self.buf[self.mark : self.pos])
+        self.mark = None
+        return value
+
+    def skip_value(self):
+        char = self.next_char()
+        if char == _QUOTE:
+            return self.skip_string()
+
+        if char not in _OPENING:
+            return self._skip_primitive()
+
+        depth = 0
+        while True:
+            for match in _NESTED_TOKEN.finditer(self.buf, self.pos):
+                start, end = match.span()
+                char = self.buf[start]
+                if char == _QUOTE:
+                    if end - start == 1:
+                        break
+                    continue
+                depth += 1 if char in _OPENING else -1
+                if depth == 0:
+                    self.pos = end
+                    return
+            else:
+                self.pos = len(self.buf)
+                if not self._fill():
+                    raise ValueError("unexpected end of JSON")
+                continue
+
+            # String continues past the buffer
+            self.pos = start
+            self.skip_string()
+
+    def _skip_primitive(self):
+        while True:
+            match = _PRIMITIVE_STOP.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return
+            self.pos = len(self.buf)
+            if not self._fill():
+                return
+
+    def capture_value(self) -> bytes:
+        self.next_char()
+        self.mark = self.pos
+        self.skip_value()
+        value = self.buf[self.mark : self.pos]
+        self.mark = None
+        return value
+
+
+def read_fields(path: str, fields: list) -> dict:
+    """
+    Returns the requested top-level keys of a JSON artifact, without loading the rest of it into memory.
+    Stops reading as soon as every field was found.
+    """
+    result = {}
+    with open(path, "rb") as f:
+        scanner = _Scanner(f)
+        scanner.expect(b"{")
+
+        while len(result) < len(fields):
+            if scanner.next_char() == ord("}"):
+                break
+
+            key = scanner.read_string()
+            scanner.expect(b":")
+            if key in fields:
+                result[key] = json.loads(scanner.capture_value())
+            else:
+                scanner.skip_value()
+
+            if scanner.next_char() == ord(","):
+                scanner.pos += 1
+
+    missing = [field for field in fields if field not in result]
+    if missing:
+        raise KeyError(f"{missing} not found in {path}")
+    return result
+
+
+def read_abi(path: str) -> list:
+    return read_fields(path, ["abi"])["abi"]
+
+
+def creation_code(path: str) -> tuple:
+    """
+    Returns `(bytecode, constructor input types)` of an artifact. The bytecode still has `__$..$__`
+    placeholders if the contract uses libraries that need linking.
+    """
+    fields = read_fields(path, ["bytecode", "abi"])
+
+    bytecode = fields["bytecode"]
+    if isinstance(bytecode, dict):
+        bytecode = bytecode["object"]
+    if not bytecode.startswith("0x"):
+        bytecode = "0x" + bytecode
+
+    types = []
+    for obj in fields["abi"]:
+        if obj["type"] == "constructor":
+            types = [input_type(inp) for inp in obj["inputs"]]
+
+    return bytecode, types
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactIndex:
+    """
+    Index of the function signatures found in `out/`, kept in the `StateStore`, so unchanged artifacts are never parsed again.
+
+    Entries are keyed by artifact path and fingerprinted with (mtime, size). If those changed, the file
+    is hashed, and only parsed when its content actually changed.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self.dirty = {}
+
+    def signatures(self, path: str) -> dict:
+        stat = os.stat(path)
+        with self.lock:
+            entry = self.dirty.get(path)
+        if entry is None:
+            entry = self.store.artifact(path)
+        if entry and not entry["sha256"].startswith(INDEX_VERSION):
+            entry = None
+
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["signatures"]
+
+        digest = INDEX_VERSION + file_digest(path)
+
+        if not entry or entry["sha256"] != digest:
+            entry = {
+                "sha256": digest,
+                "signatures": function_signatures(read_abi(path)),
+            }
+
+        entry["mtime"] = stat.st_mtime_ns
+        entry["size"] = stat.st_size
+
+        with self.lock:
+            self.dirty[path] = entry
+
+        return entry["signatures"]
+
+    def save(self):
+        with self.lock:
+            dirty, self.dirty = self.dirty, {}
+
+        if dirty:
+            self.store.set_artifacts(dirty)
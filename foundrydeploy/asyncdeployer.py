@@ -0,0 +1,317 @@
+import asyncio, contextlib, shlex
+from .deployer import Deployer, binary
+from .process import Cancelled
+from .receipt import Receipt
+from .retry import TransientError
+from . import executor, process, timing
+
+
+class AsyncDeployer(Deployer):
+    """
+    Same as `Deployer`, but `deploy`, `send` and `path` are coroutines.
+
+    `forge`/`cast` are spawned with `asyncio.create_subprocess_exec`, so a single thread can drive many
+    invocations at once. At most `concurrency` subprocesses are in flight at any time.
+
+    Example:
+        deployer = AsyncDeployer(Network.LOCAL, TEST_SIGNER, contracts, is_legacy=True, concurrency=16)
+        asyncio.run(deployer.path(path))
+    """
+
+    def __init__(self, *args, concurrency: int = 8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Same as `Deployer.signer_lock`, held across awaits
+        self.signer_lock = asyncio.Lock()
+        # Failures of the running path (see `_run_after`)
+        self.errors = []
+
+    ###########################
+    # OS execution
+    ###########################
+
+    async def run(self, cmd: list, transient: bool = False):
+        """
+        Same as `Deployer.run`. The process is killed too if the task is cancelled.
+        """
+        with timing.phase("queue"):
+            await self.semaphore.acquire()
+        try:
+            self._check_cancelled()
+            returncode, result, errors, reason = await process.run_async(
+                [binary(cmd[0])] + cmd[1:],
+                self.timeout,
+                self.cancelled,
+                self.output_limit,
+                self._forward(cmd),
+            )
+        except OSError as e:
+            self.fail(shlex.join(cmd), str(e))
+        finally:
+            self.semaphore.release()
+
+        return self._check_result(cmd, returncode, result, errors, reason, transient)
+
+    async def _transact(self, cmd: list, action: int) -> Receipt:
+        """
+        Same as `Deployer._transact`.
+        """
+        pinned = await asyncio.to_thread(self._pin_nonce, cmd)
+        if pinned is None:
+            return self._check_receipt(cmd, await self.run(cmd))
+
+        cmd, sender, nonce = pinned
+        for attempt in range(1, self.retries + 2):
+            try:
+                return self._check_receipt(cmd, await self.run(cmd, transient=True))
+            except TransientError as e:
+                await asyncio.sleep(self._retry_delay(cmd, e, attempt))
+                self._check_cancelled()
+                receipt = await asyncio.to_thread(self._landed, cmd, action, sender, nonce, str(e))
+                if receipt is not None:
+                    return receipt
+
+    ###########################
+    # Foundry Calls
+    ###########################
+
+    async def deploy(self, contract_label: str, args: str) -> str:
+        """
+        Calls `$ forge create`
+        """
+        address = self._cached_address(contract_label)
+        if address:
+            return address
+
+        print(f"Deploying | ${contract_label}...")
+
+        receipt = None
+        if self.backend is not None:
+            # The backend blocks: it runs in a thread, `forge create` fallbacks stay on the event loop
+            receipt = await asyncio.to_thread(self.backend.deploy_bytecode, contract_label, args)
+            if receipt is None:
+                await asyncio.to_thread(self.flush)
+        if receipt is None:
+            receipt = await self._transact(self._deploy_cmd(contract_label, args), Deployer.DEPLOY)
+
+        return self._store_deployed(contract_label, receipt)
+
+    async def send(self, contract_label: str, address: str, _args: str) -> str:
+        """
+        Calls `$ cast send`
+        """
+        args = self._send_args(contract_label, _args)
+        fingerprint = self._send_fingerprint(contract_label, address, args)
+        tx_hash = self._sent(contract_label, _args[0], fingerprint)
+        if tx_hash:
+            return tx_hash
+
+        receipt = await self._send_call((contract_label, _args[0], fingerprint, address, args))
+        return receipt.tx_hash
+
+    async def _send_call(self, call: tuple) -> Receipt:
+        """
+        Same as `Deployer._send_call`
+        """
+        contract_label, function_name, fingerprint, address, args = call
+        print(f"Sending   | ${contract_label} {function_name}(...) ")
+
+        if self.backend is not None:
+            with timing.phase("rpc"):
+                receipt = await asyncio.to_thread(self.backend.send, address, args[0], args[1:])
+        else:
+            receipt = await self._transact(self._send_cmd(address, args), Deployer.SEND)
+
+        self._store_receipt(contract_label, Deployer.SEND, receipt)
+        self._remember_send(contract_label, fingerprint, receipt.tx_hash)
+        return receipt
+
+    async def deploy2(self, contract_label: str, args: list) -> str:
+        """
+        Same as `Deployer.deploy2`
+        """
+        address, data = self._create2(contract_label, args)
+        cached = self.addresses.get(contract_label, "").lower() == address.lower()
+        has_code = cached or await asyncio.to_thread(self._has_code, address)
+        if self._deployed2(contract_label, address, lambda: has_code):
+            return address
+
+        print(f"Deploying | ${contract_label} at {address} (CREATE2)")
+        await asyncio.to_thread(self._require_code, self.create2_factory, "CREATE2 factory")
+
+        receipt = await self._send_data(self.create2_factory, data, Deployer.DEPLOY2)
+        return await asyncio.to_thread(self._store_deployed2, contract_label, address, receipt)
+
+    async def _send_data(self, address: str, data: bytes, action: int) -> Receipt:
+        if self.backend is not None:
+            with timing.phase("rpc"):
+                return await asyncio.to_thread(self.backend.send_data, address, data)
+        return await self._transact(self._send_data_cmd(address, data), action)
+
+    async def send_batch(self, contract_label: str, members: list) -> list:
+        """
+        Same as `Deployer.send_batch`
+        """
+        calls = self._multicall_calls(members)
+        tx_hashes = []
+        while calls:
+            if tx_hashes:
+                await asyncio.to_thread(self.flush)
+
+            batch = await asyncio.to_thread(self._multicall_batch, calls)
+            if len(batch) == 1:
+                receipt = await self._send_call(batch[0])
+                tx_hashes.append(receipt.tx_hash)
+                calls = calls[1:]
+                continue
+
+            await asyncio.to_thread(self._require_code, self.multicall_address, "Multicall3")
+            data = self._aggregate3(batch)
+            receipt = await self._send_data(self.multicall_address, data, Deployer.SEND)
+
+            self._store_multicall(contract_label, batch, receipt)
+            tx_hashes.append(receipt.tx_hash)
+            calls = calls[len(batch) :]
+
+        return tx_hashes
+
+    ###########################
+    # Signer lanes
+    ###########################
+
+    async def fund_lanes(self, amount: str):
+        """
+        Same as `Deployer.fund_lanes`
+        """
+        await asyncio.to_thread(Deployer.fund_lanes, self, amount)
+
+    ###########################
+    # Action Flow
+    ###########################
+
+    async def execute(self, action: int, contract_label: str, arguments: list):
+        """
+        Runs a single DEPLOY, DEPLOY2 or SEND action.
+        """
+        if action == Deployer.SEND:
+            await self.send(
+                contract_label,
+                self.addresses[contract_label],
+                arguments,
+            )
+        elif action == Deployer.DEPLOY:
+            await self.deploy(contract_label, arguments)
+        elif action == Deployer.DEPLOY2:
+            await self.deploy2(contract_label, arguments)
+
+    async def run_step(self, step: int, action: int, contract_label: str, arguments: list):
+        if action == Deployer.MULTICALL:
+            return await self._run_batch(contract_label, arguments)
+
+        with self.timings.action(step, Deployer.action_name(action), contract_label):
+            if self._completed(step, contract_label):
+                return
+
+            async with self._lane_async(action, contract_label, arguments):
+                self._check_started()
+                try:
+                    await self.execute(action, contract_label, arguments)
+                except BaseException as e:
+                    self._unfinished(step, action, contract_label, e)
+                    raise
+            await asyncio.to_thread(self._journal_step, step, action, contract_label)
+
+    async def _run_batch(self, contract_label: str, members: list):
+        with self.timings.action(members[0][0], Deployer.action_name(Deployer.MULTICALL), contract_label):
+            members = [member for member in members if not self._completed(member[0], member[2])]
+
+            async with self._lane_async(Deployer.MULTICALL, contract_label, members):
+                self._check_started()
+                try:
+                    await self.send_batch(contract_label, members)
+                except BaseException as e:
+                    for step, action, label, _ in members:
+                        self._unfinished(step, action, label, e)
+                    raise
+            for step, action, label, _ in members:
+                await asyncio.to_thread(self._journal_step, step, action, label)
+
+    def _lane_async(self, action: int, contract_label: str, arguments: list):
+        if self.lanes is not None:
+            return self.lanes.use_async(self._lane_signer(action, contract_label, arguments))
+        if self.backend is None:
+            return self._signer_locked_async()
+        return contextlib.nullcontext()
+
+    @contextlib.asynccontextmanager
+    async def _signer_locked_async(self):
+        with timing.phase("queue"):
+            await self.signer_lock.acquire()
+        try:
+            yield
+        finally:
+            self.signer_lock.release()
+
+    def _check_started(self):
+        """
+        Raises if the action about to start shouldn't: the path was cancelled, or another action failed
+        while it waited for its signer.
+        """
+        self._check_cancelled()
+        if self.errors:
+            raise Cancelled("an earlier action failed")
+
+    async def _run_after(self, deps: list, action: tuple):
+        """
+        Runs `action` once `deps` are done. After a failure, the actions in flight finish (their
+        transactions may be out already) but no new one starts, as in `executor.run_parallel`.
+        """
+        if deps:
+            await asyncio.gather(*deps)
+        if self.errors:
+            return
+        try:
+            await self.run_step(*action)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            # Kept for `path`: `SystemExit` (see `fail`) raised out of a task would stop the event loop
+            self.errors.append(e)
+
+    async def path(self, path: list, trace: str = None):
+        """
+        Runs the path as a dependency graph (see `executor.build_graph`): every action starts as soon
+        as the actions it depends on are done, limited by `concurrency`.
+
+        `trace` as in `Deployer.path`.
+        """
+        # May run `forge build`, which blocks
+        await asyncio.to_thread(self._start_path, path, trace)
+        actions = executor.batch_sends(self, executor.actions(self, path))
+        graph = executor.build_graph(self, actions)
+        # Lanes, or `signer_lock`, keep every signer to one action at a time
+        self.single_sender = self.lanes is not None or self.backend is None
+        if self.retries and not self.single_sender:
+            print("# Retries need one action per signer at a time (signer lanes). Off for this path")
+
+        self.errors = []
+        tasks = []
+        for index, action in enumerate(actions):
+            deps = [tasks[dep] for dep in sorted(graph[index])]
+            tasks.append(asyncio.ensure_future(self._run_after(deps, action)))
+
+        try:
+            await asyncio.gather(*tasks)
+            if self.errors:
+                raise self.errors[0]
+        except BaseException:
+            # Only left running if `path` itself was cancelled
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.save()
+            self.timings.write_trace()
+            raise
+
+        self._end_path()
@@ -1,5 +1,28 @@
-import pickle, json, subprocess, hashlib
+import asyncio, pickle, hashlib, threading, os, json, contextlib, shlex, shutil
 from . import Signer
+from . import abi, executor, lanes, process, retry, timing
+from .artifacts import ArtifactIndex, artifact_path, creation_code
+from .eth import create2_address, create_address, to_bytes
+from .journal import Journal
+from .process import Cancelled
+from .receipt import Receipt, parse_json_output
+from .retry import TransientError
+from .rpc import RpcClient, rpc_url
+from .store import StateStore
+from .timing import Timings
+
+# Resolved paths of `forge`/`cast`, looked up once per process
+_binaries = {}
+
+
+def binary(name: str) -> str:
+    """
+    Full path of `name` in the PATH, cached. The name itself if it's not found, so the spawn reports it.
+    """
+    if name not in _binaries:
+        _binaries[name] = shutil.which(name) or name
+    return _binaries[name]
+
 
 class Deployer:
 
@@ -7,6 +30,16 @@ class Deployer:
     SEND = 1
     SKIP_START = 2
     SKIP_END = 3
+    DEPLOY2 = 4
+    # Consecutive SENDs batched by `executor.batch_sends`, not used in paths
+    MULTICALL = 5
+
+    # Deterministic deployment proxy, at the same address on most chains (and on anvil by default)
+    CREATE2_FACTORY = "0x4e59b44847b379578588920cA78FbF26c0B4956C"
+
+    # Multicall3, at the same address on most chains
+    MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+    AGGREGATE3 = "aggregate3((address,bool,bytes)[])"
 
     def __init__(
         self,
@@ -16,34 +49,126 @@ class Deployer:
         is_legacy: bool,
         debug=False,
         cache_path="cache",
+        backend=None,
+        memoize_sends=True,
+        signers: list = None,
+        affinity: dict = None,
+        build_once: bool = False,
+        timeout: float = None,
+        log_output: bool = False,
+        output_limit: int = 1 << 20,
+        retries: int = 0,
+        retry_backoff: float = 1,
+        salt: str = "0x" + "00" * 32,
+        salts: dict = None,
+        create2_factory: str = None,
+        multicall=None,
+        multicall_gas: int = 10_000_000,
+        multicall_address: str = None,
     ):
         print("#####")
         print(f"# RPC: `{rpc}`")
 
         self.rpc = rpc
+        self.lock = threading.RLock()
         self.contracts = {}
         self.addresses = {}
         self.contract_signatures = {}
 
         # Load from cache if it exists
-        self.cache_path = (
-            cache_path + "/deploy_" + hashlib.sha256(rpc.encode()).hexdigest()[:8]
-        )
+        self.network = hashlib.sha256(rpc.encode()).hexdigest()[:8]
+        self.cache_path = cache_path + "/deploy_" + self.network
+        self.store = StateStore(cache_path + "/state.sqlite")
         self.load_from_cache(self.cache_path)
 
+        # Actions completed since the last snapshot, if the previous run was interrupted
+        self.journal = Journal(self.cache_path + ".journal")
+        self.path_id = None
+        self.completed_steps = set()
+        self.unconfirmed = []
+        self.recover()
+
+        # `forge`/`cast` calls are killed after `timeout` seconds, or once `cancel` is called
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+        self.log_output = log_output
+        self.output_limit = output_limit
+
+        # Transient DEPLOY/SEND failures are retried on the same nonce (see `_transact`)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.single_sender = True
+        self.client = None
+
+        # Per action timings of the current path, see `timing.Timings`
+        self.timings = Timings(self.cache_path + ".timings.jsonl")
+
+        # Skip SENDs that were already executed with the very same target and arguments
+        self.memoize_sends = memoize_sends
+        self.send_counts = {}
+
+        # Receipt of the last transaction of every label, see `receipt.Receipt`
+        self.receipts = {}
+
+        # ABI signatures of `out/` artifacts, shared by every RPC
+        self.artifacts = ArtifactIndex(self.store)
+
+        # Compile once with `forge build` and deploy the artifacts' bytecode (see `build`)
+        self.build_once = build_once
+        self.built = False
+        self.creation_codes = {}
+
+        # DEPLOY2: CREATE2 through `create2_factory`, with `salt` (or the label's in `salts`)
+        self.salt = salt
+        self.salts = salts or {}
+        for contract_label in [None] + list(self.salts):
+            self._salt(contract_label)
+        self.create2_factory = create2_factory or Deployer.CREATE2_FACTORY
+        self.create2_addresses = {}
+        # Contracts (factory, Multicall3) found to have code, see `_require_code`
+        self.code_checked = set()
+
+        # SENDs batched through Multicall3: labels / `(label, function name)`s (see `_batchable`)
+        if multicall is True:
+            raise ValueError("multicall takes the labels / (label, function name)s whose SENDs can be batched")
+        self.multicall = set(multicall or ())
+        self.multicall_gas = multicall_gas
+        self.multicall_address = multicall_address or Deployer.MULTICALL3
+
         # Add/Replace cached values
         self.add_contracts(contracts)
         self.signer = signer
+        # Without lanes or a backend, `forge`/`cast` read the signer's nonce from the node: one action at a time
+        self.signer_lock = threading.Lock()
         self.debug = debug
 
-        if is_legacy:
-            self.is_legacy = "--legacy"
+        # Extra signers to spread SENDs on (see `_lane`)
+        if affinity and not signers:
+            raise ValueError("affinity needs signers: without lanes, every action uses the deployer's signer")
+        self.lanes = lanes.SignerPool([signer] + list(signers)) if signers else None
+        self.affinity = affinity or {}
+
+        self.is_legacy = "--legacy" if is_legacy else ""
+
+        # `rpc` and `is_legacy` as command line arguments
+        self.rpc_args = shlex.split(rpc) + ([self.is_legacy] if is_legacy else [])
+
+        # Optional transaction backend (eg. `RpcBackend`), called with this deployer. `forge`/`cast` otherwise.
+        self.backend = backend(self) if backend is not None else None
         print("#####\n")
 
     ###########################
     # Helpers
     ###########################
 
+    def action_name(action: int) -> str:
+        return {
+            Deployer.DEPLOY: "DEPLOY",
+            Deployer.SEND: "SEND",
+            Deployer.DEPLOY2: "DEPLOY2",
+            Deployer.MULTICALL: "MULTICALL",
+        }.get(action, str(action))
+
     def print(self, sigs: bool = False):
         print(f"\n##\n {self.addresses}")
         if sigs:
@@ -54,7 +179,10 @@ class Deployer:
 
         if arg.startswith("$"):
             contract_label = arg[1:]
-            arg = f"{self.addresses[contract_label]}"
+            if contract_label in self.create2_addresses:
+                arg = self.create2_addresses[contract_label]
+            else:
+                arg = f"{self.addresses[contract_label]}"
 
         elif arg.startswith("#PUB"):
             arg = f"{self.signer.pub()}"
@@ -67,62 +195,123 @@ class Deployer:
     ###########################
 
     def load_from_cache(self, cache_path):
+        """
+        Loads this network's labels and addresses from the store. A legacy pickle cache at `cache_path`
+        is imported first, and renamed to `*.migrated`.
+        """
         try:
             deployer = Deployer.load(cache_path)
-            print(f"# Loading cache at `{cache_path}`")
-            self.contracts = deployer.contracts
-            self.addresses = deployer.addresses
-            self.contract_signatures = deployer.contract_signatures
-
+            print(f"# Migrating pickle cache at `{cache_path}`")
+            self.store.add_network(self.network, self.rpc)
+            self.store.set_contracts(self.network, deployer.contracts)
+            self.store.set_addresses(self.network, deployer.addresses)
+            os.replace(cache_path, cache_path + ".migrated")
         except FileNotFoundError:
-            print(f"# Starting cache at `{cache_path}`")
             pass
 
+        if self.store.has_network(self.network):
+            print(f"# Loading cache at `{self.store.db_path}` ({self.network})")
+            self.contracts = self.store.contracts(self.network)
+            self.addresses = self.store.addresses(self.network)
+        else:
+            print(f"# Starting cache at `{self.store.db_path}` ({self.network})")
+            self.store.add_network(self.network, self.rpc)
+
     def load(cache_path):
+        """
+        Reads a legacy pickle cache.
+        """
         with open(cache_path, "rb") as f:
             return pickle.load(f)
 
     def save(self):
-        with open(self.cache_path, "wb") as f:
-            pickle.dump(self, f)
+        """
+        Labels, addresses and transactions are written to the store as they change, so this only
+        persists the signatures read from `out/`.
+        """
+        self.artifacts.save()
 
     ###########################
-    # Contract loading
+    # Journal
     ###########################
 
-    def load_contract_signatures(self, contract_label: str, contract_path: str):
+    def recover(self):
         """
-            Reads ABI from out/ folder generated by foundry and loads out function names and signatures
+        Replays the journal left by an interrupted run on top of the cache.
         """
-        contract_file_path, contract_name = contract_path.split(":")
+        records = self.journal.records()
+        if not records:
+            return
 
-        out = {}
-        for chunk in contract_file_path.split("/"):
-            if chunk.endswith(".sol"):
-                with open(f"out/" + chunk + "/" + contract_name + ".json") as f:
-                    out = json.load(f)
-                    break
+        print(f"# Recovering {len(records)} journaled actions")
+        for record in records:
+            if record.get("address"):
+                self._store_address(record["label"], record["address"])
 
-        abi = out["abi"]
+    @timing.timed("cache_save")
+    def _journal_step(self, step: int, action: int, contract_label: str):
+        record = {
+            "path": self.path_id,
+            "step": step,
+            "action": action,
+            "label": contract_label,
+            "address": self.addresses.get(contract_label) if action != Deployer.SEND else None,
+        }
 
-        signatures = {}
-        for obj in abi:
-            if obj["type"] == "function":
+        self._after_confirmation(lambda: self.journal.append(record))
+
+    def _after_confirmation(self, fn):
+        """
+        Calls `fn` now, or, for pipelined transactions, once their receipts were checked (see `flush`).
+        """
+        if getattr(self.backend, "pipeline", False):
+            with self.lock:
+                self.unconfirmed.append(fn)
+        else:
+            fn()
+
+    def _completed(self, step: int, contract_label: str) -> bool:
+        if step in self.completed_steps:
+            print(f"Skipping step {step} (${contract_label}). Completed before the interruption")
+            timing.note(skipped=True)
+            return True
+        return False
+
+    def flush(self):
+        """
+        Waits for the backend's pipelined transactions, then journals and memoizes the steps they belong to.
+        """
+        if self.backend is not None:
+            self.backend.flush()
+
+        with self.lock:
+            confirmed, self.unconfirmed = self.unconfirmed, []
+        for fn in confirmed:
+            fn()
+
+    ###########################
+    # Contract loading
+    ###########################
 
-                # Get inputs
-                inputs = []
-                for inp in obj["inputs"]:
-                    inputs.append(inp["type"])
-                inputs = ",".join(inputs)
+    def load_contract_signatures(self, contract_label: str, contract_path: str):
+        """
+            Reads ABI from out/ folder generated by foundry and loads out function names and signatures
+        """
+        self.contract_signatures[contract_path] = self.artifacts.signatures(
+            artifact_path(contract_path)
+        )
 
-                # Get Name
-                func_name = obj["name"]
-                signature = "{}({})".format(func_name, inputs)
+    def signatures(self, contract_label: str) -> dict:
+        """
+        Function signatures of `contract_label`, read from `out/` the first time they are needed.
+        """
+        contract_path = self.contracts[contract_label]
 
-                if contract_path not in self.contract_signatures:
-                    self.contract_signatures[contract_path] = {}
+        with self.lock:
+            if contract_path not in self.contract_signatures:
+                self.load_contract_signatures(contract_label, contract_path)
 
-                self.contract_signatures[contract_path][func_name] = signature
+            return self.contract_signatures[contract_path]
 
     def add_contracts(self, contracts: [tuple]):
         """
@@ -131,115 +320,1037 @@ class Deployer:
                 ("CONTRACT_1_LABEL", "src/Contract1.sol:ContractName1", "0x1111111111111111111111111111111111111111"),
                 ("CONTRACT_2_LABEL", "src/Contract2.sol:ContractName2")
             ]
+
+        Signatures are only loaded once a contract is sent to (see `signatures`).
         """
+        contract_paths = {}
+        addresses = {}
         for contract in contracts:
             if contract[1] != "":
-                self.contracts[contract[0]] = contract[1]
-                self.load_contract_signatures(contract[0], contract[1])
+                contract_paths[contract[0]] = contract[1]
 
             if len(contract) == 3:
-                self.addresses[contract[0]] = contract[2]
+                addresses[contract[0]] = contract[2]
+
+        self.contracts.update(contract_paths)
+        self.addresses.update(addresses)
+        self.store.set_contracts(self.network, contract_paths)
+        self.store.set_addresses(self.network, addresses)
+
+    ###########################
+    # Build
+    ###########################
+
+    def _missing_artifacts(self, contract_labels: list) -> list:
+        """
+        Artifacts of `contract_labels` that `forge build` didn't produce.
+
+        Freshness is left to `forge build`: its cache is keyed on content hashes, so after a `git checkout`
+        or `touch` it rightly leaves unchanged artifacts older than their sources.
+        """
+        return [
+            artifact
+            for artifact in sorted({artifact_path(self.contracts[label]) for label in contract_labels})
+            if not os.path.exists(artifact)
+        ]
+
+    def build(self, contract_labels: list = None):
+        """
+        Runs `forge build` once (failing the run if it fails) and checks the artifacts of `contract_labels`
+        (every label by default) exist. Later deployments skip compilation: they send the artifact's bytecode with
+        `cast send --create` instead of calling `forge create`.
+        """
+        if contract_labels is None:
+            contract_labels = list(self.contracts)
+        contract_labels = [label for label in contract_labels if self.contracts.get(label)]
+
+        print("Building  | forge build")
+        # Blocking in every subclass: it's called from `_start_path` and from backend threads (`RpcBackend`)
+        Deployer.run(self, ["forge", "build"])
+
+        missing = self._missing_artifacts(contract_labels)
+        if missing:
+            self.fail("forge build", "Missing artifacts after building:\n" + "\n".join(missing))
+
+        with self.lock:
+            self.creation_codes = {}
+        self.built = True
+
+    def _creation_code(self, contract_label: str) -> tuple:
+        contract_path = self.contracts[contract_label]
+        with self.lock:
+            if contract_path not in self.creation_codes:
+                self.creation_codes[contract_path] = creation_code(artifact_path(contract_path))
+            return self.creation_codes[contract_path]
 
     ###########################
     # OS execution
     ###########################
 
-    def run(self, cmd: str):
-        proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE)
-        result = (proc.stdout.read()).decode()
+    def run(self, cmd: list, transient: bool = False):
+        """
+        Runs `cmd` (an argv list, eg. `["cast", "send", ...]`) without a shell and returns its stdout.
+
+        stdout and stderr are kept up to `output_limit` bytes each, and printed as they come with `log_output`.
+        The call is killed after `timeout` seconds (failing the run), or once `cancel` is called (raising `Cancelled`).
+        With `transient=True`, failures that look transient raise `TransientError` instead of failing the run.
+        """
+        self._check_cancelled()
+        try:
+            returncode, result, errors, reason = process.run(
+                [binary(cmd[0])] + cmd[1:],
+                self.timeout,
+                self.cancelled,
+                self.output_limit,
+                self._forward(cmd),
+            )
+        except OSError as e:
+            self.fail(shlex.join(cmd), str(e))
+
+        return self._check_result(cmd, returncode, result, errors, reason, transient)
+
+    def _forward(self, cmd: list):
+        if not self.log_output:
+            return None
+        return lambda line: print(f"  {cmd[0]} | {line}")
+
+    def _check_result(
+        self,
+        cmd: list,
+        returncode: int,
+        result: str,
+        errors: str = "",
+        reason: str = "",
+        transient: bool = False,
+    ) -> str:
+        cmd = shlex.join(cmd)
         if self.debug:
             print(
                 f"""
             # `{cmd}`
             ##
             $ `{result}`
+            ! `{errors}`
             --
             """
             )
-        proc.wait()
 
-        if not proc.returncode == 0:
-            self.save()
-            print(f"FAILED:\n{cmd}\n\n###\n\n{result}\n\r")
-            self.print()
-            exit(1)
+        if reason == "cancelled":
+            raise Cancelled(cmd)
+        if reason or not returncode == 0:
+            output = f"{result}\n{errors}" + (f"\n\n{reason}" if reason else "")
+            if transient and (reason or retry.is_transient(output)):
+                raise TransientError(output)
+            self.fail(cmd, output)
 
         return result
 
+    def _check_cancelled(self):
+        if self.cancelled.is_set():
+            raise Cancelled("the path was cancelled")
+
+    def cancel(self):
+        """
+        Stops the running path from any thread: running `forge`/`cast` calls are killed, the actions that
+        didn't start yet don't, and `path` raises `Cancelled`. Interrupted actions are recorded as unfinished.
+        """
+        self.cancelled.set()
+
+    def fail(self, cmd: str, result: str):
+        """
+        Saves the cache and exits.
+        """
+        self.save()
+        print(f"FAILED:\n{cmd}\n\n###\n\n{result}\n\r")
+        self.print()
+        exit(1)
+
     ###########################
-    # Foundry Calls
+    # Retries
     ###########################
 
-    def deploy(self, contract_label: str, args: str) -> str:
+    def _rpc_client(self) -> RpcClient:
+        with self.lock:
+            if self.client is None:
+                self.client = RpcClient(rpc_url(self.rpc), pool_size=1)
+        return self.client
+
+    def _rpc(self, method: str, params: list):
+        return self._rpc_client().call(method, params)
+
+    def _pin_nonce(self, cmd: list) -> tuple:
         """
-        Calls `$ forge create`
+        Returns `(cmd, sender, nonce)`, `cmd` sending with the signer's next nonce, or None if the action
+        can't be retried (retries are off, or the signer may be used by another action at the same time).
+        """
+        if not self.retries or not self.single_sender:
+            return None
+        try:
+            sender = lanes.signer_address(self.current_signer())
+        except ValueError:
+            return None
+
+        try:
+            nonce = int(self._rpc("eth_getTransactionCount", [sender, "pending"]), 16)
+        except (OSError, ValueError) as e:
+            self.fail(shlex.join(cmd), str(e))
+        # Before the positional arguments, which may take anything that follows them
+        return cmd[:2] + ["--nonce", str(nonce)] + cmd[2:], sender, nonce
+
+    def _retry_delay(self, cmd: list, error: TransientError, attempt: int) -> float:
+        """
+        Seconds to wait before retry `attempt` (from 1). Fails the run once there are no retries left.
         """
+        if attempt > self.retries:
+            self.fail(shlex.join(cmd), f"{error}\n\nGave up after {self.retries} retries")
 
+        delay = retry.backoff(attempt - 1, self.retry_backoff)
+        last_line = (str(error).strip().splitlines() or [""])[-1]
+        print(f"Retrying  | {attempt}/{self.retries} in {delay:.1f}s: {last_line}")
+        timing.note(retries=attempt)
+        return delay
+
+    def _landed(self, cmd: list, action: int, sender: str, nonce: int, output: str) -> Receipt:
+        """
+        Whether the failed attempt made it on chain anyway: its nonce was mined. Returns what is known of
+        its receipt if so, None if it's safe to send again.
+        """
+        try:
+            if int(self._rpc("eth_getTransactionCount", [sender, "latest"]), 16) <= nonce:
+                return None
+
+            receipt = self._parse_receipt(output)
+            if action == Deployer.DEPLOY and not receipt.address:
+                receipt.address = create_address(sender, nonce)
+                if self._rpc("eth_getCode", [receipt.address, "latest"]) in ("0x", "", None):
+                    self.fail(shlex.join(cmd), f"nonce {nonce} of {sender} was used by another transaction")
+        except (OSError, ValueError) as e:
+            self.fail(shlex.join(cmd), str(e))
+
+        print(f"Landed    | nonce {nonce} of {sender} was mined before the retry")
+        return receipt
+
+    def _transact(self, cmd: list, action: int) -> Receipt:
+        """
+        Runs a DEPLOY/SEND `cmd` and returns its receipt. Transient failures (see `retry.is_transient`) are
+        retried up to `retries` times, with exponential backoff and jitter.
+
+        Every attempt uses the nonce read before the first one, so at most one of them can be mined.
+        Before retrying, the chain is checked for the previous attempt, which is used if it landed.
+        """
+        pinned = self._pin_nonce(cmd)
+        if pinned is None:
+            return self._check_receipt(cmd, self.run(cmd))
+
+        cmd, sender, nonce = pinned
+        for attempt in range(1, self.retries + 2):
+            try:
+                return self._check_receipt(cmd, self.run(cmd, transient=True))
+            except TransientError as e:
+                self.cancelled.wait(self._retry_delay(cmd, e, attempt))
+                self._check_cancelled()
+                receipt = self._landed(cmd, action, sender, nonce, str(e))
+                if receipt is not None:
+                    return receipt
+
+    ###########################
+    # Foundry Calls
+    ###########################
+
+    def _cached_address(self, contract_label: str) -> str:
+        """
+        Returns the cached address of `contract_label`, or "" if it still needs deploying.
+        """
         # Skips deployment if there's an address cached for this contract label
         if contract_label in self.addresses:
             print(
                 f"Skipping ${contract_label} deployment. Has address: {self.addresses[contract_label]}"
             )
+            timing.note(skipped=True)
             return self.addresses[contract_label]
 
+        return ""
+
+    @timing.timed("args")
+    def _deploy_cmd(self, contract_label: str, args: list) -> list:
         contract_path = self.contracts[contract_label]
+        options = self.rpc_args + self.current_signer().args() + ["--json"]
 
-        # Stringify arguments
-        const = ""
+        if self.built:
+            bytecode, types = self._creation_code(contract_label)
+            # Libraries still need linking by forge
+            if "__$" not in bytecode:
+                constructor = [f"constructor({','.join(types)})"] if types else []
+                const = [self._handle_arg(arg) for arg in args]
+                return ["cast", "send"] + options + ["--create", bytecode] + constructor + const
+
+        const = []
         for arg in args:
-            const += f"--constructor-args {self._handle_arg(arg)} "
+            const += ["--constructor-args", self._handle_arg(arg)]
 
-        print(f"Deploying | ${contract_label}...")
+        return ["forge", "create"] + options + [contract_path] + const
 
-        # Call `forge create`
-        result = self.run(
-            f"forge create {self.rpc} {self.is_legacy} {self.signer.get()} {contract_path} {const}"
-        )
+    @timing.timed("parse")
+    def _parse_receipt(self, result: str) -> Receipt:
+        """
+        Reads the `--json` output of `forge create` / `cast send`. Falls back to the plain text output,
+        which only has the address and transaction hash.
+        """
+        output = parse_json_output(result)
+        if output is not None:
+            return Receipt.from_json(output)
 
-        # Store deployed address
-        address = ""
+        return Receipt(tx_hash=self._parse_tx_hash(result), address=self._parse_deployed(result))
+
+    def _parse_deployed(self, result: str) -> str:
+        """
+        Parses the deployed address out of the plain `forge create` / `cast send --create` output.
+        """
         for line in result.splitlines():
             if "Deployed to: " in line:
-                address = line[-42:]
-                break
+                return line[-42:]
+            if line.startswith("contractAddress"):
+                return line.split()[-1]
+        return None
 
-        if address == "":
-            raise ValueError("address not sucessfully parsed")
+    def _parse_tx_hash(self, result: str) -> str:
+        """
+        Parses the transaction hash out of the plain `forge create` / `cast send` output, "" if there's none.
+        """
+        for line in result.splitlines():
+            if "Transaction hash: " in line or line.startswith("transactionHash"):
+                return line.split()[-1]
+        return ""
 
-        self.addresses[contract_label] = address
+    def _check_receipt(self, cmd: list, result: str) -> Receipt:
+        """
+        Parses the receipt of `cmd` and fails if its transaction reverted.
+        """
+        receipt = self._parse_receipt(result)
+        if receipt.status == 0:
+            self.fail(shlex.join(cmd), result)
+        return receipt
+
+    @timing.timed("cache_save")
+    def _store_address(self, contract_label: str, address: str) -> str:
+        with self.lock:
+            self.addresses[contract_label] = address
+            self.store.set_addresses(self.network, {contract_label: address})
 
         return address
 
-    def send(self, contract_label: str, address: str, _args: str) -> str:
+    @timing.timed("cache_save")
+    def _store_receipt(self, contract_label: str, action: int, receipt: Receipt):
         """
-        Calls `$ cast send`
+        Stores the transaction now, and its receipt once confirmed (pipelined receipts are filled in on `flush`).
         """
+        timing.note(tx_hash=receipt.tx_hash or None)
+        with self.lock:
+            self.receipts[contract_label] = receipt
+        if not receipt.tx_hash:
+            return
 
-        contract_path = self.contracts[contract_label]
+        self.store.add_transaction(self.network, receipt.tx_hash, contract_label, action)
+        self._after_confirmation(
+            lambda: self.store.add_receipt(self.network, contract_label, action, receipt.to_dict())
+        )
+
+    def _send_fingerprint(
+        self, contract_label: str, address: str, args: list, counts: dict = None
+    ) -> str:
+        """
+        Identifies a SEND by its label, target, signature and resolved arguments. Identical SENDs
+        within a path are told apart by how many came before them (counted in `counts`, `send_counts` by default).
+        """
+        if not self.memoize_sends:
+            return ""
+
+        counts = self.send_counts if counts is None else counts
+        call = json.dumps([contract_label, address.lower(), [str(arg) for arg in args]])
+        with self.lock:
+            occurrence = counts.get(call, 0)
+            counts[call] = occurrence + 1
+
+        return hashlib.sha256(f"{call}#{occurrence}".encode()).hexdigest()
+
+    def _sent(self, contract_label: str, function_name: str, fingerprint: str) -> str:
+        """
+        Returns the transaction hash if this SEND was already executed, "" otherwise.
+        """
+        tx_hash = self.store.sent(self.network, fingerprint) if fingerprint else None
+        if tx_hash is None:
+            return ""
+
+        print(f"Skipping ${contract_label} {function_name}(...). Already sent: {tx_hash or '(no hash)'}")
+        timing.note(skipped=True, tx_hash=tx_hash or None)
+        return tx_hash or "0x"
+
+    @timing.timed("cache_save")
+    def _remember_send(self, contract_label: str, fingerprint: str, tx_hash: str):
+        if fingerprint:
+            self._after_confirmation(
+                lambda: self.store.add_send(self.network, fingerprint, contract_label, tx_hash)
+            )
+
+    @timing.timed("args")
+    def _send_args(self, contract_label: str, _args: list) -> list:
+        """
+        Replaces the function name with its signature and resolves the remaining arguments.
+        """
+        signatures = self.signatures(contract_label)
 
         # Get function signature
         function_name = _args[0]
-        if function_name not in self.contract_signatures[contract_path]:
-            raise ValueError(f"{function_name} does not exist in {self.contract_path}")
+        if function_name not in signatures:
+            raise ValueError(f"{function_name} does not exist in {self.contracts[contract_label]}")
+
+        return [signatures[function_name]] + [
+            self._handle_arg(arg) for arg in _args[1:]
+        ]
 
-        _args[0] = '"' + self.contract_signatures[contract_path][function_name] + '"'
+    def _send_cmd(self, address: str, args: list) -> list:
+        return ["cast", "send", address] + self.rpc_args + self.current_signer().args() + ["--json"] + args
 
+    def deploy(self, contract_label: str, args: str) -> str:
+        """
+        Calls `$ forge create`
+        """
+        address = self._cached_address(contract_label)
+        if address:
+            return address
+
+        print(f"Deploying | ${contract_label}...")
+
+        if self.backend is not None:
+            receipt = self.backend.deploy(contract_label, args)
+        else:
+            # Call `forge create`
+            receipt = self._transact(self._deploy_cmd(contract_label, args), Deployer.DEPLOY)
+
+        return self._store_deployed(contract_label, receipt)
+
+    def _store_deployed(self, contract_label: str, receipt: Receipt) -> str:
+        self._store_receipt(contract_label, Deployer.DEPLOY, receipt)
+        if not receipt.address:
+            raise ValueError("address not sucessfully parsed")
+
+        if receipt.predicted:
+            # Usable by the next actions right away, but only cached once the receipt confirms it
+            print(f"Predicted | ${contract_label} at {receipt.address}")
+            address = receipt.address
+            with self.lock:
+                self.addresses[contract_label] = address
+            self._after_confirmation(lambda: self._store_address(contract_label, address))
+            return address
+
+        # Store deployed address
+        return self._store_address(contract_label, receipt.address)
+
+    def send(self, contract_label: str, address: str, _args: str) -> str:
+        """
+        Calls `$ cast send`
+
+        Skipped if the very same call was already sent (see `_send_fingerprint`)
+        """
+        args = self._send_args(contract_label, _args)
+        fingerprint = self._send_fingerprint(contract_label, address, args)
+        tx_hash = self._sent(contract_label, _args[0], fingerprint)
+        if tx_hash:
+            return tx_hash
+
+        return self._send_call((contract_label, _args[0], fingerprint, address, args)).tx_hash
+
+    def _send_call(self, call: tuple) -> Receipt:
+        """
+        Sends `(label, function name, fingerprint, address, resolved args)` from the signer and memoizes it.
+        """
+        contract_label, function_name, fingerprint, address, args = call
         print(f"Sending   | ${contract_label} {function_name}(...) ")
 
-        # Stringify arguments
-        args = ""
-        for index, arg in enumerate(_args):
-            args += f" {self._handle_arg(arg)} "
+        if self.backend is not None:
+            with timing.phase("rpc"):
+                receipt = self.backend.send(address, args[0], args[1:])
+        else:
+            receipt = self._transact(self._send_cmd(address, args), Deployer.SEND)
+
+        self._store_receipt(contract_label, Deployer.SEND, receipt)
+        self._remember_send(contract_label, fingerprint, receipt.tx_hash)
+        return receipt
+
+    ###########################
+    # CREATE2
+    ###########################
+
+    def _salt(self, contract_label: str) -> bytes:
+        """
+        The factory reads the first 32 bytes of the calldata as the salt: anything longer would compute
+        another address than the one deployed to.
+        """
+        salt = to_bytes(self.salts.get(contract_label, self.salt))
+        if len(salt) > 32:
+            of = f" of ${contract_label}" if contract_label else ""
+            raise ValueError(f"CREATE2 salt{of} is longer than 32 bytes")
+        return salt.rjust(32, b"\0")
+
+    @timing.timed("args")
+    def _create2(self, contract_label: str, args: list) -> tuple:
+        """
+        `(address, calldata)` of a DEPLOY2: the factory takes the salt followed by the init code
+        (creation bytecode and ABI encoded constructor arguments).
+        """
+        bytecode, types = self._creation_code(contract_label)
+        if "__$" in bytecode:
+            raise ValueError(f"${contract_label} needs library linking, which DEPLOY2 doesn't support")
 
-        self.run(
-            f"cast send {address} {self.rpc} {self.is_legacy} {self.signer.get()} {args}"
+        init_code = to_bytes(bytecode) + abi.encode(types, [self._handle_arg(arg) for arg in args])
+        salt = self._salt(contract_label)
+        return create2_address(self.create2_factory, salt, init_code), salt + init_code
+
+    def compute_create2_addresses(self, path: list) -> dict:
+        """
+        Computes the address of every DEPLOY2 of `path` offline, and keeps them to resolve `$LABEL`s.
+        DEPLOY2s using labels that are only known once deployed (plain DEPLOYs) are left out.
+        """
+        self.create2_addresses = {}
+        for _, action, contract_label, arguments in executor.actions(self, path):
+            if action != Deployer.DEPLOY2:
+                continue
+            try:
+                address, _ = self._create2(contract_label, arguments)
+            except (KeyError, OSError, ValueError):
+                continue
+            self.create2_addresses[contract_label] = address
+
+        return dict(self.create2_addresses)
+
+    def _has_code(self, address: str) -> bool:
+        try:
+            return self._rpc("eth_getCode", [address, "latest"]) not in ("0x", "", None)
+        except (OSError, ValueError) as e:
+            self.fail(f"eth_getCode {address}", str(e))
+
+    def _require_code(self, address: str, name: str):
+        """
+        Fails the run if there's no code at `address`: a call to it would succeed without doing anything.
+        Checked once per address.
+        """
+        with self.lock:
+            if address.lower() in self.code_checked:
+                return
+        if not self._has_code(address):
+            self.fail(f"eth_getCode {address}", f"No {name} at {address} on this network")
+        with self.lock:
+            self.code_checked.add(address.lower())
+
+    def _deployed2(self, contract_label: str, address: str, has_code) -> bool:
+        """
+        Whether a DEPLOY2 at `address` can be skipped: it's the cached address, or there's code at it already
+        (eg. deployed with the same salt by another script). `has_code()` is only called if needed.
+        """
+        with self.lock:
+            self.create2_addresses[contract_label] = address
+
+        if self.addresses.get(contract_label, "").lower() == address.lower():
+            print(f"Skipping ${contract_label} deployment. Has address: {address}")
+        elif has_code():
+            print(f"Skipping ${contract_label} deployment. Already deployed at {address}")
+            self._store_address(contract_label, address)
+        else:
+            return False
+
+        timing.note(skipped=True)
+        return True
+
+    @timing.timed("args")
+    def _send_data_cmd(self, address: str, data: bytes) -> list:
+        return (
+            ["cast", "send", address]
+            + self.rpc_args
+            + self.current_signer().args()
+            + ["--json", "0x" + data.hex()]
         )
 
+    def _store_deployed2(self, contract_label: str, address: str, receipt: Receipt) -> str:
+        """
+        The address is only cached once there's code at it: the factory doesn't revert if the creation fails.
+        """
+        receipt.address = address
+        self._store_receipt(contract_label, Deployer.DEPLOY2, receipt)
+        with self.lock:
+            self.addresses[contract_label] = address
+
+        def store():
+            if not self._has_code(address):
+                self.fail(
+                    f"DEPLOY2 ${contract_label}",
+                    f"Transaction {receipt.tx_hash} succeeded, but there's no code at {address}",
+                )
+            self._store_address(contract_label, address)
+
+        self._after_confirmation(store)
+        return address
+
+    def deploy2(self, contract_label: str, args: list) -> str:
+        """
+        Deploys through the CREATE2 factory: the address only depends on the factory, the salt and the
+        init code, so it's the same on every network and known before anything is sent.
+        """
+        address, data = self._create2(contract_label, args)
+        if self._deployed2(contract_label, address, lambda: self._has_code(address)):
+            return address
+
+        print(f"Deploying | ${contract_label} at {address} (CREATE2)")
+        self._require_code(self.create2_factory, "CREATE2 factory")
+
+        if self.backend is not None:
+            with timing.phase("rpc"):
+                receipt = self.backend.send_data(self.create2_factory, data)
+        else:
+            receipt = self._transact(self._send_data_cmd(self.create2_factory, data), Deployer.DEPLOY2)
+
+        return self._store_deployed2(contract_label, address, receipt)
+
+    ###########################
+    # Multicall
+    ###########################
+
+    def _batchable(self, contract_label: str, arguments: list) -> bool:
+        """
+        Whether a SEND can go through Multicall3: `multicall` names its label or `(label, function name)`,
+        and it has no signer affinity (the call comes from Multicall3 anyway).
+
+        There's no `multicall=True`: `msg.sender` is Multicall3, so calls that depend on it (eg. an `initialize`
+        setting the owner, `approve`) don't revert but act for a contract anyone can call.
+        """
+        if not self.multicall:
+            return False
+        key = (contract_label, arguments[0])
+        if contract_label in self.affinity or key in self.affinity:
+            return False
+        return contract_label in self.multicall or key in self.multicall
+
+    def _multicall_calls(self, members: list) -> list:
+        """
+        `(label, function name, fingerprint, address, resolved args)` of the SENDs in `members` that weren't sent yet.
+        """
+        calls = []
+        for _, _, contract_label, arguments in members:
+            address = self.addresses[contract_label]
+            args = self._send_args(contract_label, arguments)
+            fingerprint = self._send_fingerprint(contract_label, address, args)
+            if self._sent(contract_label, arguments[0], fingerprint):
+                continue
+            calls.append((contract_label, arguments[0], fingerprint, address, args))
+        return calls
+
+    def _calldata(self, call: tuple) -> bytes:
+        args = call[4]
+        return abi.encode_call(args[0], args[1:])
+
+    @timing.timed("rpc")
+    def _multicall_batch(self, calls: list) -> list:
+        """
+        Leading `calls` whose gas estimates (from the Multicall3 address, in one JSON-RPC batch) add up to at
+        most `multicall_gas`. Each estimate includes the base cost of a transaction, so the sum is on the safe side.
+
+        A call whose estimate reverts ends the batch, and is estimated again once the batch is mined (eg. it
+        needs an earlier call of the batch). If it's the first one, it's returned on its own: it may only revert
+        from Multicall3 (eg. `onlyOwner`), so it's sent from the signer instead (see `send_batch`).
+        """
+        try:
+            estimates = self._rpc_client().batch(
+                [
+                    (
+                        "eth_estimateGas",
+                        [{"from": self.multicall_address, "to": call[3], "data": "0x" + self._calldata(call).hex()}],
+                    )
+                    for call in calls
+                ],
+                errors=True,
+            )
+        except (OSError, ValueError) as e:
+            self.fail("eth_estimateGas", str(e))
+
+        batch, gas = [], 0
+        for call, estimate in zip(calls, estimates):
+            if isinstance(estimate, Exception):
+                if batch:
+                    break
+                return [call]
+
+            if batch and gas + int(estimate, 16) > self.multicall_gas:
+                break
+            batch.append(call)
+            gas += int(estimate, 16)
+
+        return batch
+
+    def _aggregate3(self, batch: list) -> bytes:
+        print(f"Multicall | " + ", ".join(f"${label} {function_name}(...)" for label, function_name, *_ in batch))
+        return abi.encode_call(
+            Deployer.AGGREGATE3, [[(call[3], False, self._calldata(call)) for call in batch]]
+        )
+
+    def _store_multicall(self, contract_label: str, batch: list, receipt: Receipt):
+        """
+        The aggregate transaction's receipt is stored under `contract_label`, and is the last one of every label in it.
+        """
+        self._store_receipt(contract_label, Deployer.MULTICALL, receipt)
+        for label, _, fingerprint, _, _ in batch:
+            with self.lock:
+                self.receipts[label] = receipt
+            self._remember_send(label, fingerprint, receipt.tx_hash)
+
+    def send_batch(self, contract_label: str, members: list) -> list:
+        """
+        Sends the SEND actions `members` through Multicall3's `aggregate3`, in as few transactions as
+        `multicall_gas` allows. Every call has to succeed, or the whole transaction reverts.
+        Batches of one are sent from the signer, as a plain SEND. Returns the transaction hashes.
+        """
+        calls = self._multicall_calls(members)
+        tx_hashes = []
+        while calls:
+            # Estimates need the previous batch mined
+            if tx_hashes:
+                self.flush()
+
+            batch = self._multicall_batch(calls)
+            if len(batch) == 1:
+                tx_hashes.append(self._send_call(batch[0]).tx_hash)
+                calls = calls[1:]
+                continue
+
+            self._require_code(self.multicall_address, "Multicall3")
+            data = self._aggregate3(batch)
+            if self.backend is not None:
+                with timing.phase("rpc"):
+                    receipt = self.backend.send_data(self.multicall_address, data)
+            else:
+                receipt = self._transact(self._send_data_cmd(self.multicall_address, data), Deployer.SEND)
+
+            self._store_multicall(contract_label, batch, receipt)
+            tx_hashes.append(receipt.tx_hash)
+            calls = calls[len(batch) :]
+
+        return tx_hashes
+
+    ###########################
+    # Signer lanes
+    ###########################
+
+    def current_signer(self) -> Signer:
+        """
+        Signer of the lane the current action runs on, the deployer's signer otherwise.
+        """
+        return lanes.current_signer() or self.signer
+
+    def _lane_signer(self, action: int, contract_label: str, arguments: list) -> Signer:
+        """
+        Signer an action has to use, or None if any lane will do.
+
+        `affinity` maps a label, or a `(label, function name)`, to a signer. DEPLOYs without affinity
+        use the deployer's signer, so it stays the owner of every contract.
+        """
+        if action == Deployer.SEND and (contract_label, arguments[0]) in self.affinity:
+            return self.affinity[(contract_label, arguments[0])]
+        if contract_label in self.affinity:
+            return self.affinity[contract_label]
+        return self.signer if action == Deployer.DEPLOY else None
+
+    def _lane(self, action: int, contract_label: str, arguments: list):
+        if self.lanes is not None:
+            return self.lanes.use(self._lane_signer(action, contract_label, arguments))
+        if self.backend is None:
+            return self._signer_locked()
+        return contextlib.nullcontext()
+
+    @contextlib.contextmanager
+    def _signer_locked(self):
+        with timing.phase("queue"):
+            self.signer_lock.acquire()
+        try:
+            yield
+        finally:
+            self.signer_lock.release()
+
+    def fund_lanes(self, amount: str):
+        """
+        Tops up every lane signer to `amount` (eg. "1ether") from the deployer's signer.
+        """
+        if self.lanes is None:
+            return
+
+        target = abi.parse_int(amount)
+        for signer in self.lanes.signers:
+            if signer is self.signer:
+                continue
+
+            address = lanes.signer_address(signer)
+            if self.backend is not None:
+                balance = self.backend.balance(address)
+            else:
+                # Blocking in every subclass (`AsyncDeployer.fund_lanes` runs this in a thread)
+                balance = abi.parse_int(
+                    Deployer.run(self, ["cast", "balance", address] + shlex.split(self.rpc)).split()[0]
+                )
+
+            if balance >= target:
+                print(f"Skipping {address} funding. Has balance: {balance}")
+                continue
+
+            print(f"Funding   | {address} with {target - balance} wei")
+            if self.backend is not None:
+                self.backend.transfer(address, target - balance)
+            else:
+                Deployer.run(
+                    self,
+                    ["cast", "send", address, "--value", str(target - balance)]
+                    + self.rpc_args
+                    + self.signer.args()
+                )
+
+        self.flush()
+
     ###########################
     # Action Flow
     ###########################
 
-    def path(self, path: list):
+    def run_step(self, step: int, action: int, contract_label: str, arguments: list):
+        """
+        Runs step `step` of the current path, unless it completed before an interruption, and journals it.
+        """
+        if action == Deployer.MULTICALL:
+            return self._run_batch(contract_label, arguments)
+
+        with self.timings.action(step, Deployer.action_name(action), contract_label):
+            if self._completed(step, contract_label):
+                return
+
+            with self._lane(action, contract_label, arguments):
+                self._check_cancelled()
+                try:
+                    self.execute(action, contract_label, arguments)
+                except BaseException as e:
+                    self._unfinished(step, action, contract_label, e)
+                    raise
+            self._journal_step(step, action, contract_label)
+
+    def _run_batch(self, contract_label: str, members: list):
+        """
+        `run_step` of a MULTICALL: journals every SEND of `members`.
+        """
+        with self.timings.action(members[0][0], Deployer.action_name(Deployer.MULTICALL), contract_label):
+            members = [member for member in members if not self._completed(member[0], member[2])]
+
+            with self._lane(Deployer.MULTICALL, contract_label, members):
+                self._check_cancelled()
+                try:
+                    self.send_batch(contract_label, members)
+                except BaseException as e:
+                    for step, action, label, _ in members:
+                        self._unfinished(step, action, label, e)
+                    raise
+            for step, action, label, _ in members:
+                self._journal_step(step, action, label)
+
+    def _unfinished(self, step: int, action: int, contract_label: str, error: BaseException):
+        """
+        Records a step interrupted while running. Its transaction may or may not have been sent.
+        """
+        if isinstance(error, (Cancelled, asyncio.CancelledError)):
+            reason = "cancelled"
+        elif isinstance(error, SystemExit):
+            reason = "failed"
+        else:
+            reason = type(error).__name__
+        self.store.add_unfinished(self.network, self.path_id, step, contract_label, action, reason)
+
+    def _start_path(self, path: list, trace: str = None):
+        self.path_id = executor.fingerprint(path)
+        self.send_counts = {}
+        self.cancelled.clear()
+
+        for step, contract_label, action, reason in self.store.unfinished(self.network, self.path_id):
+            print(
+                f"# Step {step} ({Deployer.action_name(action)} ${contract_label}) did not finish last time ({reason}). "
+                "Its transaction may have been sent"
+            )
+
+        # Deploying the bytecode in `out/` (`RpcBackend`, DEPLOY2s) implies building first, so it's never stale
+        if not self.built:
+            bytecode_deploys = self.build_once or getattr(self.backend, "bytecode_deploys", False)
+            pending = [
+                label
+                for _, action, label, _ in executor.actions(self, path)
+                if (action == Deployer.DEPLOY2 or (action == Deployer.DEPLOY and bytecode_deploys))
+                and label not in self.addresses
+            ]
+            if pending:
+                self.build(pending)
+
+        self.compute_create2_addresses(path)
+
+        self.timings.start(trace)
+        self.completed_steps = {
+            record["step"]
+            for record in self.journal.records()
+            if record.get("path") == self.path_id
+        }
+
+    def _end_path(self):
+        """
+        Compacts the journal into the cache snapshot.
+        """
+        self.flush()
+        self.save()
+        self.journal.compact()
+        self.store.clear_unfinished(self.network, self.path_id)
+        self.completed_steps = set()
+        self.timings.write_trace()
+        self.timings.summary()
+        self.print()
+
+    def execute(self, action: int, contract_label: str, arguments: list):
+        """
+        Runs a single DEPLOY, DEPLOY2 or SEND action.
+        """
+        if action == Deployer.SEND:
+            self.send(
+                contract_label,
+                self.addresses[contract_label],
+                arguments,
+            )
+        elif action == Deployer.DEPLOY:
+            self.deploy(contract_label, arguments)
+        elif action == Deployer.DEPLOY2:
+            self.deploy2(contract_label, arguments)
+
+    def plan(self, path: list) -> list:
+        """
+        Dry run: resolves every action of `path` against the cache and the artifacts in `out/`, without
+        spawning `forge`/`cast` or touching the RPC. Prints and returns one entry per action:
+
+            {"step": 3, "action": Deployer.SEND, "label": "B", "status": "send", "detail": "..."}
+
+        `status` is one of:
+            * "deploy" / "send": would be executed.
+            * "skip": cached, already sent, or completed before an interruption.
+            * "unresolved": uses `$LABEL`s that are neither cached nor deployed earlier in the path.
+            * "error": unknown label or function, or missing artifact.
+
+        SENDs using addresses only known once the path runs can't be matched against the sent ones, so they
+        are reported as "send". DEPLOY2 addresses are computed, so they're reported as a "deploy" at an address.
+        """
+        create2_addresses = self.compute_create2_addresses(path)
+        path_id = executor.fingerprint(path)
+        completed = {
+            record["step"] for record in self.journal.records() if record.get("path") == path_id
+        }
+        addresses = dict(self.addresses)
+        addresses.update(create2_addresses)
+        deployed = set()
+        send_counts = {}
+        entries = []
+
+        print(f"\n# Plan ({self.network})")
+        for step, action, contract_label, arguments in executor.actions(self, path):
+            entry = {"step": step, "action": action, "label": contract_label}
+            entries.append(entry)
+
+            refs = executor.label_refs(arguments)
+            if action == Deployer.SEND:
+                refs = [contract_label] + refs
+            unresolved = sorted({ref for ref in refs if ref not in addresses})
+            pending = any(ref in deployed for ref in refs)
+
+            # Same order as `run_step` and `deploy`: a cached label is skipped even without a contract path
+            if step in completed:
+                entry["status"], entry["detail"] = "skip", "completed before the interruption"
+                if action != Deployer.SEND:
+                    addresses.setdefault(contract_label, "")
+            elif action == Deployer.DEPLOY and contract_label in self.addresses:
+                entry["status"] = "skip"
+                entry["detail"] = f"has address: {self.addresses[contract_label]}"
+            elif contract_label not in self.contracts and action in (Deployer.DEPLOY, Deployer.DEPLOY2):
+                entry["status"], entry["detail"] = "error", f"${contract_label} has no contract path"
+            elif action == Deployer.DEPLOY:
+                if unresolved:
+                    entry["status"], entry["unresolved"] = "unresolved", unresolved
+                    entry["detail"] = "needs " + " ".join(f"${r}" for r in unresolved)
+                else:
+                    entry["status"], entry["detail"] = "deploy", self.contracts[contract_label]
+                    addresses[contract_label] = ""
+                    deployed.add(contract_label)
+            elif action == Deployer.DEPLOY2:
+                address = create2_addresses.get(contract_label)
+                if address is None:
+                    entry["status"], entry["unresolved"] = "unresolved", unresolved
+                    entry["detail"] = "needs " + " ".join(f"${r}" for r in unresolved)
+                elif self.addresses.get(contract_label, "").lower() == address.lower():
+                    entry["status"], entry["detail"] = "skip", f"has address: {address}"
+                else:
+                    entry["status"] = "deploy"
+                    entry["detail"] = f"{self.contracts[contract_label]} at {address} (CREATE2)"
+            else:
+                entry.update(
+                    self._plan_send(
+                        contract_label, arguments, addresses, unresolved, pending, send_counts
+                    )
+                )
+
+            print(f"{entry['status']:<10} | {step:>3} ${contract_label} {entry['detail']}")
+
+        counts = {}
+        for entry in entries:
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        unresolved = sorted({ref for entry in entries for ref in entry.get("unresolved", [])})
+        if unresolved:
+            print(f"## {counts} Unresolved: " + " ".join(f"${ref}" for ref in unresolved))
+        else:
+            print(f"## {counts}")
+
+        return entries
+
+    def _plan_send(
+        self,
+        contract_label: str,
+        arguments: list,
+        addresses: dict,
+        unresolved: list,
+        pending: bool,
+        send_counts: dict,
+    ) -> dict:
+        function_name = arguments[0]
+        try:
+            signature = self.signatures(contract_label).get(function_name)
+        except (KeyError, OSError, ValueError) as e:
+            return {"status": "error", "detail": f"{function_name}(...): no signatures ({e})"}
+
+        if signature is None:
+            return {
+                "status": "error",
+                "detail": f"{function_name} does not exist in {self.contracts[contract_label]}",
+            }
+        if unresolved:
+            return {
+                "status": "unresolved",
+                "unresolved": unresolved,
+                "detail": f"{function_name}(...) needs " + " ".join(f"${r}" for r in unresolved),
+            }
+        if pending:
+            return {"status": "send", "detail": f"{signature}"}
+
+        args = [signature] + [self._handle_arg(arg) for arg in arguments[1:]]
+        fingerprint = self._send_fingerprint(
+            contract_label, addresses[contract_label], args, send_counts
+        )
+        tx_hash = self.store.sent(self.network, fingerprint) if fingerprint else None
+        if tx_hash is not None:
+            return {"status": "skip", "detail": f"{signature} already sent: {tx_hash or '(no hash)'}"}
+
+        return {"status": "send", "detail": f"{signature}"}
+
+    def path(self, path: list, workers: int = 1, dry_run: bool = False, trace: str = None):
         """
         Example:
 
@@ -255,26 +1366,36 @@ class Deployer:
             ]
 
         Will skip the first Deploy and execute the rest, one after the other.
+
+        With `workers` > 1, actions are run as a dependency graph built from their `$LABEL` arguments
+        (see `executor.build_graph`), and up to `workers` independent actions are run at the same time.
+
+        Every completed action is journaled as soon as it finishes. If the run is interrupted, running the
+        same path again resumes from the exact next step.
+
+        With `dry_run=True`, nothing is run and the `plan` is returned instead.
+
+        With `trace="trace.json"`, a timeline of every action is written in Chrome trace-event format
+        (see `timing.Timings`).
         """
-        skipping = False
-        for (action, contract_contract_label, arguments) in path:
+        if dry_run:
+            return self.plan(path)
 
-            if action == Deployer.SKIP_START:
-                skipping = True
-            elif action == Deployer.SKIP_END:
-                skipping = False
-                continue
+        self._start_path(path, trace)
+        actions = executor.batch_sends(self, executor.actions(self, path))
+        self.single_sender = workers <= 1 or self.lanes is not None or self.backend is None
+        if self.retries and not self.single_sender:
+            print("# Retries need one action per signer at a time (`workers=1` or signer lanes). Off for this path")
 
-            if skipping:
-                continue
-            elif action == Deployer.SEND:
-                self.send(
-                    contract_contract_label,
-                    self.addresses[contract_contract_label],
-                    arguments,
-                )
-            elif action == Deployer.DEPLOY:
-                self.deploy(contract_contract_label, arguments)
+        try:
+            if workers > 1:
+                executor.run_parallel(self, actions, workers)
+            else:
+                for action in actions:
+                    self.run_step(*action)
+        except BaseException:
+            self.save()
+            self.timings.write_trace()
+            raise
 
-        self.save()
-        self.print()
+        self._end_path()
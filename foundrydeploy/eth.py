@@ -0,0 +1,283 @@
+"""
+Minimal, dependency free Ethereum primitives: keccak256, RLP, secp256k1 signing and transaction encoding.
+"""
+import hashlib, hmac
+
+
+###########################
+# Keccak
+###########################
+
+_KECCAK_ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+
+_KECCAK_ROTATIONS = [
+    [0, 36, 3, 41, 18],
+    [1, 44, 10, 45, 2],
+    [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56],
+    [27, 20, 39, 8, 14],
+]
+
+_MASK_64 = (1 << 64) - 1
+
+
+def _rotl(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (64 - shift))) & _MASK_64 if shift else value
+
+
+def _keccak_f(state: list):
+    for round_constant in _KECCAK_ROUND_CONSTANTS:
+        # θ
+        c = [state[x][0] ^ state[x][1] ^ state[x][2] ^ state[x][3] ^ state[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rotl(c[(x + 1) % 5], 1) for x in range(5)]
+        for x in range(5):
+            for y in range(5):
+                state[x][y] ^= d[x]
+
+        # ρ and π
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                b[y][(2 * x + 3 * y) % 5] = _rotl(state[x][y], _KECCAK_ROTATIONS[x][y])
+
+        # χ
+        for x in range(5):
+            for y in range(5):
+                state[x][y] = b[x][y] ^ (~b[(x + 1) % 5][y] & b[(x + 2) % 5][y])
+
+        # ι
+        state[0][0] ^= round_constant
+
+
+def keccak256(data: bytes) -> bytes:
+    """
+    Keccak-256 as used by Ethereum (original padding, not NIST SHA3-256).
+    """
+    rate = 136
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b"\x00" * (-len(padded) % rate))
+    padded[-1] |= 0x80
+
+    state = [[0] * 5 for _ in range(5)]
+    for offset in range(0, len(padded), rate):
+        block = padded[offset : offset + rate]
+        for i in range(rate // 8):
+            state[i % 5][i // 5] ^= int.from_bytes(block[i * 8 : i * 8 + 8], "little")
+        _keccak_f(state)
+
+    return b"".join(state[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+
+
+###########################
+# RLP
+###########################
+
+
+def rlp_encode(item) -> bytes:
+    """
+    Encodes bytes, ints (big endian, no leading zeros) and (nested) lists.
+    """
+    if isinstance(item, int):
+        item = item.to_bytes((item.bit_length() + 7) // 8, "big")
+
+    if isinstance(item, (bytes, bytearray)):
+        if len(item) == 1 and item[0] < 0x80:
+            return bytes(item)
+        return _rlp_length(len(item), 0x80) + bytes(item)
+
+    payload = b"".join(rlp_encode(i) for i in item)
+    return _rlp_length(len(payload), 0xC0) + payload
+
+
+def _rlp_length(length: int, offset: int) -> bytes:
+    if length < 56:
+        return bytes([offset + length])
+    encoded = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([offset + 55 + len(encoded)]) + encoded
+
+
+###########################
+# secp256k1
+###########################
+
+_P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+_G = (
+    0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+    0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+)
+
+
+def _jacobian_double(p: tuple) -> tuple:
+    x, y, z = p
+    if not y:
+        return (0, 0, 0)
+    ysq = (y * y) % _P
+    s = (4 * x * ysq) % _P
+    m = (3 * x * x) % _P
+    nx = (m * m - 2 * s) % _P
+    ny = (m * (s - nx) - 8 * ysq * ysq) % _P
+    nz = (2 * y * z) % _P
+    return (nx, ny, nz)
+
+
+def _jacobian_add(p: tuple, q: tuple) -> tuple:
+    if not p[1]:
+        return q
+    if not q[1]:
+        return p
+    u1 = (p[0] * q[2] ** 2) % _P
+    u2 = (q[0] * p[2] ** 2) % _P
+    s1 = (p[1] * q[2] ** 3) % _P
+    s2 = (q[1] * p[2] ** 3) % _P
+    if u1 == u2:
+        if s1 != s2:
+            return (0, 0, 1)
+        return _jacobian_double(p)
+    h = u2 - u1
+    r = s2 - s1
+    h2 = (h * h) % _P
+    h3 = (h * h2) % _P
+    u1h2 = (u1 * h2) % _P
+    nx = (r * r - h3 - 2 * u1h2) % _P
+    ny = (r * (u1h2 - nx) - s1 * h3) % _P
+    nz = (h * p[2] * q[2]) % _P
+    return (nx, ny, nz)
+
+
+def _multiply(point: tuple, scalar: int) -> tuple:
+    result = (0, 0, 1)
+    addend = (point[0], point[1], 1)
+    while scalar:
+        if scalar & 1:
+            result = _jacobian_add(result, addend)
+        addend = _jacobian_double(addend)
+        scalar >>= 1
+
+    x, y, z = result
+    z_inv = pow(z, -1, _P)
+    return ((x * z_inv**2) % _P, (y * z_inv**3) % _P)
+
+
+def _deterministic_k(key: int, msg_hash: bytes) -> int:
+    """
+    RFC 6979 nonce generation.
+    """
+    v = b"\x01" * 32
+    k = b"\x00" * 32
+    key_bytes = key.to_bytes(32, "big")
+    k = hmac.new(k, v + b"\x00" + key_bytes + msg_hash, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    k = hmac.new(k, v + b"\x01" + key_bytes + msg_hash, hashlib.sha256).digest()
+    v = hmac.new(k, v, hashlib.sha256).digest()
+    while True:
+        v = hmac.new(k, v, hashlib.sha256).digest()
+        candidate = int.from_bytes(v, "big")
+        if 1 <= candidate < _N:
+            return candidate
+        k = hmac.new(k, v + b"\x00", hashlib.sha256).digest()
+        v = hmac.new(k, v, hashlib.sha256).digest()
+
+
+def sign(msg_hash: bytes, private_key: bytes) -> tuple:
+    """
+    Returns `(y_parity, r, s)` with a low `s`.
+    """
+    key = int.from_bytes(private_key, "big")
+    k = _deterministic_k(key, msg_hash)
+    rx, ry = _multiply(_G, k)
+    r = rx % _N
+    s = (pow(k, -1, _N) * (int.from_bytes(msg_hash, "big") + r * key)) % _N
+    y_parity = ry & 1
+    if s > _N // 2:
+        s = _N - s
+        y_parity ^= 1
+    return (y_parity, r, s)
+
+
+def private_key_to_address(private_key: bytes) -> str:
+    x, y = _multiply(_G, int.from_bytes(private_key, "big"))
+    return to_checksum_address(keccak256(x.to_bytes(32, "big") + y.to_bytes(32, "big"))[-20:])
+
+
+def to_checksum_address(address) -> str:
+    """
+    EIP-55 checksummed address from raw bytes or a hex string.
+    """
+    if isinstance(address, (bytes, bytearray)):
+        address = address.hex()
+    address = address.lower().replace("0x", "")
+    digest = keccak256(address.encode()).hex()
+    return "0x" + "".join(
+        c.upper() if int(digest[i], 16) >= 8 else c for i, c in enumerate(address)
+    )
+
+
+###########################
+# Transactions
+###########################
+
+
+def to_bytes(value: str) -> bytes:
+    """
+    Hex string (with or without `0x`) to bytes.
+    """
+    if value.startswith("0x"):
+        value = value[2:]
+    if len(value) % 2:
+        value = "0" + value
+    return bytes.fromhex(value)
+
+
+def create_address(sender: str, nonce: int) -> str:
+    """
+    Address of the contract created by `sender`'s transaction with `nonce`.
+    """
+    return to_checksum_address(keccak256(rlp_encode([to_bytes(sender), nonce]))[12:])
+
+
+def create2_address(factory: str, salt: bytes, init_code: bytes) -> str:
+    """
+    Address of the contract created by `factory` with CREATE2, `salt` and `init_code`.
+    """
+    return to_checksum_address(keccak256(b"\xff" + to_bytes(factory) + salt + keccak256(init_code))[12:])
+
+
+def sign_transaction(tx: dict, private_key: bytes) -> bytes:
+    """
+    Signs and encodes a transaction.
+
+    `tx` holds `chainId`, `nonce`, `gas`, `to` (None for contract creation), `value`, `data` and either
+    `gasPrice` for a legacy (EIP-155) transaction or `maxFeePerGas`/`maxPriorityFeePerGas` for EIP-1559.
+    """
+    to = to_bytes(tx["to"]) if tx.get("to") else b""
+    data = tx.get("data", b"")
+    value = tx.get("value", 0)
+
+    if "gasPrice" in tx:
+        fields = [tx["nonce"], tx["gasPrice"], tx["gas"], to, value, data]
+        y_parity, r, s = sign(keccak256(rlp_encode(fields + [tx["chainId"], 0, 0])), private_key)
+        return rlp_encode(fields + [y_parity + 35 + 2 * tx["chainId"], r, s])
+
+    fields = [
+        tx["chainId"],
+        tx["nonce"],
+        tx["maxPriorityFeePerGas"],
+        tx["maxFeePerGas"],
+        tx["gas"],
+        to,
+        value,
+        data,
+        [],
+    ]
+    y_parity, r, s = sign(keccak256(b"\x02" + rlp_encode(fields)), private_key)
+    return b"\x02" + rlp_encode(fields + [y_parity, r, s])
+
@@ -0,0 +1,179 @@
+import contextvars, hashlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+###########################
+# Path parsing
+###########################
+
+
+def actions(deployer, path: list) -> list:
+    """
+    Drops everything between `SKIP_START` and `SKIP_END`, returning the actions that will run
+    as `(step, action, contract_label, arguments)`, where `step` is the index in `path`.
+    """
+    result = []
+    skipping = False
+    for step, (action, contract_label, arguments) in enumerate(path):
+
+        if action == deployer.SKIP_START:
+            skipping = True
+        elif action == deployer.SKIP_END:
+            skipping = False
+            continue
+
+        if skipping:
+            continue
+        elif action in (deployer.DEPLOY, deployer.DEPLOY2, deployer.SEND):
+            result.append((step, action, contract_label, arguments))
+
+    return result
+
+
+def batch_sends(deployer, actions: list) -> list:
+    """
+    Replaces runs of consecutive SENDs that can go through Multicall3 (see `Deployer._batchable`) with
+    a single `(step, MULTICALL, "multicall", [SEND actions])`, `step` being the first one's.
+    """
+    result = []
+    run = []
+
+    def close_run():
+        if len(run) > 1:
+            result.append((run[0][0], deployer.MULTICALL, "multicall", list(run)))
+        else:
+            result.extend(run)
+        run.clear()
+
+    for action in actions:
+        if action[1] == deployer.SEND and deployer._batchable(action[2], action[3]):
+            run.append(action)
+        else:
+            close_run()
+            result.append(action)
+    close_run()
+
+    return result
+
+
+def fingerprint(path: list) -> str:
+    """
+    Identifies a path, so journaled steps are only resumed for the very same path.
+    """
+    return hashlib.sha256(repr(path).encode()).hexdigest()[:16]
+
+
+def label_refs(arguments: list) -> list:
+    """
+    Returns the labels referenced as `$LABEL` in a list of arguments.
+    """
+    return [
+        arg[1:] for arg in arguments if isinstance(arg, str) and arg.startswith("$")
+    ]
+
+
+###########################
+# Dependency graph
+###########################
+
+
+def build_graph(deployer, actions: list) -> list:
+    """
+    Returns, for every action, the set of action indexes it has to wait for.
+
+    An action depends on:
+        * the last DEPLOY of every `$LABEL` it uses as an argument, unless its address was computed
+          offline (DEPLOY2s in `deployer.create2_addresses`).
+        * the last DEPLOY of its own label, when it's a SEND.
+        * the previous action on its own label, so calls to the same contract keep their order.
+
+    A MULTICALL depends on everything its SENDs depend on.
+
+    Labels that are never deployed in the path are expected to be cached already and add no edges.
+    """
+    computed = deployer.create2_addresses
+    last_deploy = {}
+    last_action = {}
+    graph = []
+
+    for index, (step, action, contract_label, arguments) in enumerate(actions):
+        members = arguments if action == deployer.MULTICALL else [(step, action, contract_label, arguments)]
+        deps = set()
+
+        for _, action, contract_label, arguments in members:
+            for ref in label_refs(arguments):
+                if ref in last_deploy and ref not in computed:
+                    deps.add(last_deploy[ref])
+
+            if action == deployer.SEND and contract_label in last_deploy:
+                deps.add(last_deploy[contract_label])
+
+            if contract_label in last_action:
+                deps.add(last_action[contract_label])
+
+        graph.append(deps)
+
+        for _, action, contract_label, _ in members:
+            last_action[contract_label] = index
+            if action in (deployer.DEPLOY, deployer.DEPLOY2):
+                last_deploy[contract_label] = index
+
+    return graph
+
+
+###########################
+# Execution
+###########################
+
+
+def run_parallel(deployer, actions: list, workers: int):
+    """
+    Runs independent branches of the path at the same time, with at most `workers` actions in flight.
+
+    Ready actions are started in path order. If an action fails, nothing new is started, the ones
+    in flight are allowed to finish and the first error is raised.
+    """
+    graph = build_graph(deployer, actions)
+
+    dependents = [[] for _ in actions]
+    pending = [len(deps) for deps in graph]
+    for index, deps in enumerate(graph):
+        for dep in deps:
+            dependents[dep].append(index)
+
+    ready = [index for index, count in enumerate(pending) if count == 0]
+    running = {}
+    error = None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while ready or running:
+
+            # Only hand the pool what it can start right away, so nothing is left queued after an error
+            while ready and error is None and len(running) < workers:
+                index = ready.pop(0)
+                # Workers see the caller's context variables (eg. the network name of `MultiDeployer`)
+                future = pool.submit(contextvars.copy_context().run, deployer.run_step, *actions[index])
+                running[future] = index
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: running[f]):
+                index = running.pop(future)
+                try:
+                    future.result()
+                except BaseException as e:
+                    if error is None:
+                        error = e
+                    continue
+
+                for dependent in dependents[index]:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        ready.append(dependent)
+
+            ready.sort()
+
+    if error is not None:
+        raise error
@@ -0,0 +1,153 @@
+import contextlib, contextvars, sys, threading, time
+from .deployer import Deployer
+
+# Name of the network whose output is being printed in this thread
+_network = contextvars.ContextVar("foundrydeploy_network", default="")
+
+
+class _PrefixedOutput:
+    """
+    Stands in for stdout while several networks run, prefixing every line with the network that printed it.
+    Lines are buffered per thread, so output from different networks never interleaves within a line.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        buf = getattr(self.local, "buf", "") + text
+        *lines, self.local.buf = buf.split("\n")
+        if lines:
+            prefix = f"[{_network.get()}] " if _network.get() else ""
+            with self.lock:
+                self.stream.write("".join(f"{prefix}{line}\n" for line in lines))
+        return len(text)
+
+    def flush(self):
+        buf = getattr(self.local, "buf", "")
+        if buf:
+            self.write("\n")
+        self.stream.flush()
+
+
+class NetworkResult:
+    def __init__(self, name: str, rpc: str):
+        self.name = name
+        self.rpc = rpc
+        self.deployer = None
+        self.error = None
+        self.wall = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def addresses(self) -> dict:
+        return dict(self.deployer.addresses) if self.deployer is not None else {}
+
+
+class MultiDeployer:
+    """
+    Runs the same path on several networks at once, one thread and one `Deployer` per network.
+
+    Every network has its own signer and its own state (tied to its RPC in the cache, plus its own journal),
+    and a failure on one network only stops that network. Once all of them are done, a combined table
+    is printed and the `NetworkResult`s are returned by name.
+
+    Example:
+        deployer = MultiDeployer(
+            [
+                ("LOCAL", Network.LOCAL, TEST_SIGNER),
+                ("AVAX_TEST", Network.AVAX_TEST, test_signer),
+                ("AVAX_MAIN", Network.AVAX_MAIN, main_signer, {"is_legacy": False}),
+            ],
+            contracts,
+            is_legacy=True,
+        )
+        results = deployer.path(path)
+
+    The optional 4th element of a target overrides the `Deployer` keyword arguments for that network.
+    """
+
+    def __init__(self, targets: list, contracts: list, is_legacy: bool, **kwargs):
+        rpcs = [target[1] for target in targets]
+        if len(set(rpcs)) != len(rpcs):
+            raise ValueError("every network needs its own RPC, since the state is tied to it")
+
+        self.targets = targets
+        self.contracts = contracts
+        self.kwargs = dict(kwargs, is_legacy=is_legacy)
+
+    def _run(self, target: tuple, path: list, workers: int, result: NetworkResult):
+        name, rpc, signer = target[:3]
+        overrides = target[3] if len(target) > 3 else {}
+
+        _network.set(name)
+        start = time.perf_counter()
+        try:
+            kwargs = dict(self.kwargs, **overrides)
+            result.deployer = Deployer(rpc, signer, self.contracts, **kwargs)
+            result.deployer.path(path, workers=workers)
+        except SystemExit as e:
+            # `Deployer.fail` already reported it and exits, which only ends this network's thread
+            result.error = e
+        except Exception as e:
+            result.error = e
+            print(f"FAILED: {type(e).__name__}: {e}")
+        finally:
+            result.wall = time.perf_counter() - start
+            sys.stdout.flush()
+
+    def path(self, path: list, workers: int = 1) -> dict:
+        """
+        Runs `path` on every network (see `Deployer.path`). `workers` applies to each network.
+        """
+        results = {target[0]: NetworkResult(target[0], target[1]) for target in self.targets}
+
+        output = _PrefixedOutput(sys.stdout)
+        with contextlib.redirect_stdout(output):
+            threads = [
+                threading.Thread(
+                    target=contextvars.copy_context().run,
+                    args=(self._run, target, path, workers, results[target[0]]),
+                    name=f"foundrydeploy-{target[0]}",
+                )
+                for target in self.targets
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.print(results)
+        return results
+
+    def print(self, results: dict):
+        print("\n## Networks")
+        print(
+            f"{'network':<16} | {'status':<6} | {'executed':>8} | {'skipped':>7} | {'failed':>6} | {'time':>8}"
+        )
+        for result in results.values():
+            records = result.deployer.timings.records if result.deployer is not None else []
+            skipped = sum(1 for r in records if r["skipped"])
+            failed = sum(1 for r in records if "error" in r)
+            print(
+                f"{result.name:<16} | {'ok' if result.ok else 'FAILED':<6} | {len(records) - skipped - failed:>8} | "
+                f"{skipped:>7} | {failed:>6} | {result.wall:>7.2f}s"
+            )
+
+        labels = []
+        for result in results.values():
+            labels += [label for label in result.addresses if label not in labels]
+        if not labels:
+            return
+
+        print(f"\n{'label':<16} | " + " | ".join(f"{name:<42}" for name in results))
+        for label in labels:
+            print(
+                f"{label:<16} | "
+                + " | ".join(f"{result.addresses.get(label, '-'):<42}" for result in results.values())
+            )
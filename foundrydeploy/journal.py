@@ -0,0 +1,90 @@
+import json, os, threading
+
+
+class Journal:
+    """
+    Append-only log of the actions completed since the last cache snapshot, one JSON object per line.
+
+    Every `append` is durable when it returns. Concurrent appends share a single fsync (group commit):
+    the first writer to reach the disk syncs everything written so far, the others just wait for it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.synced = threading.Condition(self.lock)
+        self.written = 0
+        self.synced_seq = 0
+        self.syncing = False
+        self.f = None
+
+    def _file(self):
+        if self.f is None:
+            self._drop_torn_tail()
+            self.f = open(self.path, "a")
+        return self.f
+
+    def _drop_torn_tail(self):
+        """
+        Truncates a last line left unterminated by a crash, so the next record starts on its own line.
+        """
+        try:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                if data and not data.endswith(b"\n"):
+                    f.truncate(data.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    def records(self) -> list:
+        """
+        Replays the journal. Torn lines (killed while writing) are skipped.
+        """
+        records = []
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def append(self, record: dict):
+        with self.lock:
+            f = self._file()
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            self.written += 1
+            seq = self.written
+
+            while self.synced_seq < seq:
+                if not self.syncing:
+                    # Leader: sync everything written so far on behalf of every waiting writer
+                    self.syncing = True
+                    target = self.written
+                    self.lock.release()
+                    try:
+                        os.fsync(f.fileno())
+                    finally:
+                        self.lock.acquire()
+                        self.syncing = False
+                    self.synced_seq = max(self.synced_seq, target)
+                    self.synced.notify_all()
+                else:
+                    self.synced.wait()
+
+    def compact(self):
+        """
+        Drops every record. Only call once they are all part of a durable snapshot.
+        """
+        with self.lock:
+            if self.f is not None:
+                self.f.close()
+                self.f = None
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,98 @@
+import asyncio, contextlib, contextvars, threading
+from . import KeyKind, timing
+from .eth import private_key_to_address, to_bytes
+
+# Signer of the action running in this thread/task, if it runs on a lane
+_signer = contextvars.ContextVar("foundrydeploy_signer", default=None)
+
+
+def current_signer():
+    return _signer.get()
+
+
+def signer_address(signer) -> str:
+    """
+    The signer's `pub`, or the address of its private key.
+    """
+    if signer.pub:
+        return signer.pub
+    if signer.key_kind == KeyKind.PRIVATE:
+        return private_key_to_address(to_bytes(signer.key_argument))
+    raise ValueError(f"{signer.key_kind} signers need a `pub` address")
+
+
+class SignerPool:
+    """
+    Lanes of signers, each with its own nonce sequence. An action holds a signer for as long as it runs,
+    so two actions never send from the same key at the same time (`forge`/`cast` read the nonce from the
+    node, and would collide otherwise).
+
+    Actions ask for a specific signer (affinity), or take whichever is free first.
+    """
+
+    def __init__(self, signers: list):
+        self.signers = list(signers)
+        self.free = list(signers)
+        self.cond = threading.Condition()
+
+    def _available(self, signer):
+        if signer is None:
+            return self.free[0] if self.free else None
+        return signer if signer in self.free else None
+
+    def take(self, signer=None, block: bool = True):
+        """
+        Takes `signer` (any if None) out of the pool. Returns None if `block=False` and it's busy.
+        """
+        if signer is not None and signer not in self.signers:
+            raise ValueError(f"{signer_address(signer)} is not part of the signer pool")
+
+        with self.cond:
+            taken = self._available(signer)
+            while taken is None and block:
+                self.cond.wait()
+                taken = self._available(signer)
+
+            if taken is not None:
+                self.free.remove(taken)
+            return taken
+
+    def give_back(self, signer):
+        with self.cond:
+            self.free.append(signer)
+            self.cond.notify_all()
+
+    @contextlib.contextmanager
+    def use(self, signer=None):
+        """
+        Runs the block on a lane: `current_signer()` is the taken signer until it's given back.
+        """
+        with timing.phase("queue"):
+            signer = self.take(signer)
+
+        token = _signer.set(signer)
+        timing.note(signer=signer_address(signer))
+        try:
+            yield signer
+        finally:
+            _signer.reset(token)
+            self.give_back(signer)
+
+    @contextlib.asynccontextmanager
+    async def use_async(self, signer=None, poll_interval: float = 0.01):
+        """
+        Same as `use`, without blocking the event loop while waiting for a lane.
+        """
+        with timing.phase("queue"):
+            taken = self.take(signer, block=False)
+            while taken is None:
+                await asyncio.sleep(poll_interval)
+                taken = self.take(signer, block=False)
+
+        token = _signer.set(taken)
+        timing.note(signer=signer_address(taken))
+        try:
+            yield taken
+        finally:
+            _signer.reset(token)
+            self.give_back(taken)
@@ -0,0 +1,81 @@
+import heapq, threading
+
+
+class NonceManager:
+    """
+    Hands out nonces locally for one signer on one RPC, so transactions can be broadcast back-to-back
+    without waiting for the previous receipt.
+
+    Nonces that were allocated but never made it on the wire are `release`d and handed out again first,
+    so they don't leave a gap that blocks every later transaction.
+
+    Use `NonceManager.get` to share a single manager between every backend using the same signer and RPC.
+    """
+
+    managers = {}
+    managers_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, rpc: str, address: str, fetch):
+        """
+        Returns the manager for (`rpc`, `address`). `fetch()` returns the pending nonce on chain.
+        """
+        key = (rpc, address.lower())
+        with cls.managers_lock:
+            if key not in cls.managers:
+                cls.managers[key] = cls(fetch)
+            return cls.managers[key]
+
+    def __init__(self, fetch):
+        self.fetch = fetch
+        self.lock = threading.Lock()
+        self.next_nonce = None
+        self.released = []
+
+    def allocate(self) -> int:
+        with self.lock:
+            if self.released:
+                return heapq.heappop(self.released)
+
+            if self.next_nonce is None:
+                self.next_nonce = self.fetch()
+
+            nonce = self.next_nonce
+            self.next_nonce += 1
+            return nonce
+
+    def release(self, nonce: int) -> bool:
+        """
+        `nonce` was never broadcast and can be handed out again. Returns True if it leaves a gap: later
+        nonces were handed out, and are stuck until it's used (see `take_gaps`).
+        """
+        with self.lock:
+            if self.next_nonce is not None and nonce == self.next_nonce - 1:
+                self.next_nonce -= 1
+                return False
+            heapq.heappush(self.released, nonce)
+            return True
+
+    def take_gaps(self) -> list:
+        """
+        Returns and forgets the released nonces. Until they are used, every later transaction is stuck.
+        """
+        with self.lock:
+            gaps = sorted(self.released)
+            self.released = []
+            return gaps
+
+    def resync(self) -> int:
+        """
+        Re-reads the pending nonce from chain, eg. after a "nonce too low" because the key was used elsewhere.
+        Moves forward if the chain is ahead, and forgets released nonces that were used in the meantime.
+        """
+        with self.lock:
+            chain_nonce = self.fetch()
+            self.released = [n for n in self.released if n >= chain_nonce]
+            heapq.heapify(self.released)
+
+            if self.next_nonce is None or chain_nonce > self.next_nonce:
+                self.next_nonce = chain_nonce
+
+            return chain_nonce
@@ -0,0 +1,176 @@
+import asyncio, collections, contextvars, subprocess, threading, time
+from . import timing
+
+# How often a running `forge`/`cast` is checked for cancellation and timeouts
+POLL_INTERVAL = 0.05
+
+# Bytes read from a pipe at once
+CHUNK_SIZE = 1 << 16
+
+
+class Cancelled(Exception):
+    """
+    Raised by the actions that were running, or about to run, when `Deployer.cancel` was called.
+    """
+
+
+class OutputBuffer:
+    """
+    Keeps the last `limit` bytes of a stream, line by line, and hands every complete line to `forward`.
+    """
+
+    def __init__(self, limit: int, forward=None):
+        self.limit = limit
+        self.forward = forward
+        self.lines = collections.deque()
+        self.size = 0
+        self.dropped = 0
+        self.partial = b""
+
+    def write(self, data: bytes):
+        *lines, self.partial = (self.partial + data).split(b"\n")
+        # A single line can't grow past the limit either
+        if len(self.partial) > self.limit:
+            lines.append(self.partial)
+            self.partial = b""
+
+        for line in lines:
+            self._line(line.decode(errors="replace"))
+
+    def close(self):
+        if self.partial:
+            self._line(self.partial.decode(errors="replace"))
+            self.partial = b""
+
+    def _line(self, line: str):
+        self.lines.append(line)
+        self.size += len(line) + 1
+        while self.size > self.limit and len(self.lines) > 1:
+            self.size -= len(self.lines.popleft()) + 1
+            self.dropped += 1
+
+        if self.forward is not None:
+            self.forward(line)
+
+    def text(self) -> str:
+        head = f"[{self.dropped} lines dropped]\n" if self.dropped else ""
+        return head + "\n".join(self.lines)
+
+
+def _interrupted(deadline: float, timeout: float, cancelled: threading.Event) -> str:
+    if cancelled is not None and cancelled.is_set():
+        return "cancelled"
+    if deadline is not None and time.monotonic() > deadline:
+        return f"timed out after {timeout}s"
+    return ""
+
+
+###########################
+# Threads
+###########################
+
+
+def _pump(stream, buffer: OutputBuffer):
+    for chunk in iter(lambda: stream.read1(CHUNK_SIZE), b""):
+        buffer.write(chunk)
+    buffer.close()
+    stream.close()
+
+
+def run(
+    argv: list, timeout: float = None, cancelled: threading.Event = None, limit: int = 1 << 20, forward=None
+) -> tuple:
+    """
+    Runs `argv` without a shell. stdout and stderr are streamed into `OutputBuffer`s of `limit` bytes
+    (and to `forward`, line by line) as they are printed.
+
+    The process is killed once `timeout` seconds have passed, or once `cancelled` is set.
+    Returns `(returncode, stdout, stderr, reason)`, `reason` being why it was killed, "" otherwise.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    with timing.phase("spawn"):
+        proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    with timing.phase("subprocess"):
+        stdout, stderr = OutputBuffer(limit, forward), OutputBuffer(limit, forward)
+        readers = [
+            threading.Thread(
+                target=contextvars.copy_context().run, args=(_pump, stream, buffer), daemon=True
+            )
+            for stream, buffer in [(proc.stdout, stdout), (proc.stderr, stderr)]
+        ]
+        for reader in readers:
+            reader.start()
+
+        reason = ""
+        while any(reader.is_alive() for reader in readers) or proc.poll() is None:
+            reason = _interrupted(deadline, timeout, cancelled)
+            if reason:
+                proc.kill()
+                break
+
+            alive = [reader for reader in readers if reader.is_alive()]
+            if alive:
+                alive[0].join(POLL_INTERVAL)
+            else:
+                try:
+                    proc.wait(POLL_INTERVAL)
+                except subprocess.TimeoutExpired:
+                    pass
+
+        proc.wait()
+        for reader in readers:
+            reader.join()
+
+    return proc.returncode, stdout.text(), stderr.text(), reason
+
+
+###########################
+# asyncio
+###########################
+
+
+async def _pump_async(stream, buffer: OutputBuffer):
+    while True:
+        chunk = await stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.write(chunk)
+    buffer.close()
+
+
+async def run_async(
+    argv: list, timeout: float = None, cancelled: threading.Event = None, limit: int = 1 << 20, forward=None
+) -> tuple:
+    """
+    Same as `run`, with `asyncio.create_subprocess_exec`. The process is killed too if the task is cancelled.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    with timing.phase("spawn"):
+        proc = await asyncio.create_subprocess_exec(
+            *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+
+    with timing.phase("subprocess"):
+        stdout, stderr = OutputBuffer(limit, forward), OutputBuffer(limit, forward)
+        done = asyncio.ensure_future(
+            asyncio.gather(_pump_async(proc.stdout, stdout), _pump_async(proc.stderr, stderr), proc.wait())
+        )
+
+        reason = ""
+        try:
+            while not done.done():
+                await asyncio.wait({done}, timeout=POLL_INTERVAL)
+                reason = "" if done.done() else _interrupted(deadline, timeout, cancelled)
+                if reason:
+                    proc.kill()
+                    break
+            await done
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                done.cancel()
+
+    return proc.returncode, stdout.text(), stderr.text(), reason
@@ -0,0 +1,89 @@
+import json
+
+
+def _int(value) -> int:
+    """
+    Receipt numbers come as hex strings from the RPC / `cast`, and as ints from some `forge` versions.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    value = str(value)
+    return int(value, 16) if value.startswith("0x") else int(value)
+
+
+def parse_json_output(result: str) -> dict:
+    """
+    Returns the JSON object printed by `forge`/`cast` with `--json`, skipping anything printed before it
+    (eg. compiler output). None if there's none.
+    """
+    lines = result.splitlines()
+    for i, line in enumerate(lines):
+        if line.lstrip().startswith("{"):
+            try:
+                return json.loads("\n".join(lines[i:]))
+            except ValueError:
+                continue
+    return None
+
+
+class Receipt:
+    """
+    Outcome of a DEPLOY or SEND, as reported by `forge create --json`, `cast send --json` or the RPC.
+    Fields that weren't reported (eg. gas by `forge create`) are None.
+    """
+
+    FIELDS = ["tx_hash", "address", "gas_used", "effective_gas_price", "block_number", "status"]
+
+    def __init__(
+        self,
+        tx_hash: str = "",
+        address: str = None,
+        gas_used: int = None,
+        effective_gas_price: int = None,
+        block_number: int = None,
+        status: int = None,
+    ):
+        self.tx_hash = tx_hash
+        self.address = address
+        self.gas_used = gas_used
+        self.effective_gas_price = effective_gas_price
+        self.block_number = block_number
+        self.status = status
+
+        # `address` was derived from the sender and nonce, and the transaction isn't confirmed yet
+        self.predicted = False
+
+    @classmethod
+    def from_json(cls, obj: dict):
+        """
+        From a JSON-RPC receipt (`cast send --json`) or the `forge create --json` output.
+        """
+        return cls().fill(obj)
+
+    def fill(self, obj: dict):
+        """
+        Updates the fields reported by `obj` (eg. once a pipelined transaction is mined).
+        """
+        self.tx_hash = obj.get("transactionHash") or self.tx_hash
+        self.address = obj.get("contractAddress") or obj.get("deployedTo") or self.address
+        for field, key in [
+            ("gas_used", "gasUsed"),
+            ("effective_gas_price", "effectiveGasPrice"),
+            ("block_number", "blockNumber"),
+            ("status", "status"),
+        ]:
+            if obj.get(key) is not None:
+                setattr(self, field, _int(obj[key]))
+        return self
+
+    @property
+    def fee(self) -> int:
+        if self.gas_used is None or self.effective_gas_price is None:
+            return None
+        return self.gas_used * self.effective_gas_price
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in Receipt.FIELDS}
+
+    def __repr__(self):
+        return f"Receipt({self.to_dict()})"
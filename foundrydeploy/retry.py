@@ -0,0 +1,62 @@
+import http.client, random, re
+
+# Failures that may go away on their own: rate limits, timeouts, overloaded or unreachable nodes
+TRANSIENT = re.compile(
+    "|".join(
+        [
+            r"\b429\b",
+            r"too many requests",
+            r"rate.?limit",
+            r"limit exceeded",
+            r"timed? ?out",
+            r"connection (refused|reset|closed|aborted)",
+            r"broken pipe",
+            r"error sending request",
+            r"\b50[234]\b",
+            r"bad gateway",
+            r"service unavailable",
+            r"temporarily unavailable",
+            r"header not found",
+        ]
+    ),
+    re.IGNORECASE,
+)
+
+# A previous attempt is still sitting in the pool, and may be mined before the next one
+PENDING = re.compile(r"already known|replacement transaction underpriced", re.IGNORECASE)
+
+# HTTP statuses worth retrying
+TRANSIENT_STATUS = {429, 502, 503, 504}
+
+
+class TransientError(Exception):
+    """
+    A call failed in a way that may succeed if tried again. Carries the call's output.
+    """
+
+
+def is_transient(output: str) -> bool:
+    """
+    Whether the output of a failed `forge`/`cast` call looks transient.
+    Anything else (reverts, bad arguments, insufficient funds, ...) is permanent.
+    """
+    return TRANSIENT.search(output) is not None or PENDING.search(output) is not None
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Same as `is_transient`, for an exception raised talking to the RPC.
+    """
+    if getattr(error, "code", None) in TRANSIENT_STATUS:
+        return True
+    if isinstance(error, (ConnectionError, TimeoutError, http.client.HTTPException)):
+        return True
+    return TRANSIENT.search(str(error)) is not None
+
+
+def backoff(attempt: int, base: float, cap: float = 30) -> float:
+    """
+    Seconds to wait before retry `attempt` (from 0): exponential, with full jitter so parallel
+    actions hitting the same rate limit don't retry in lockstep.
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
@@ -0,0 +1,522 @@
+import http.client, itertools, json, threading, time
+from urllib.parse import urlsplit
+from . import KeyKind
+from . import abi, retry, timing
+from .eth import (
+    create_address,
+    keccak256,
+    private_key_to_address,
+    sign_transaction,
+    to_bytes,
+    to_checksum_address,
+)
+from .lanes import current_signer
+from .nonce import NonceManager
+from .process import Cancelled
+from .receipt import Receipt
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data=None):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+def rpc_url(rpc: str) -> str:
+    """
+    "--rpc-url http://127.0.0.1:8545" -> "http://127.0.0.1:8545"
+    """
+    return rpc.split()[-1]
+
+
+###########################
+# Transport
+###########################
+
+
+class RpcClient:
+    """
+    JSON-RPC over HTTP(S) with a pool of keep-alive connections.
+
+    At most `pool_size` connections are open at once; callers beyond that wait for one to be released.
+
+    Transient failures (429/5xx, dropped connections, timeouts, rate limit errors) are retried up to
+    `retries` times with exponential backoff (see `retry.backoff`).
+    """
+
+    def __init__(
+        self, url: str, pool_size: int = 4, timeout: float = 60, retries: int = 3, backoff: float = 0.5
+    ):
+        parsed = urlsplit(url)
+        self.url = url
+        self.https = parsed.scheme == "https"
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(pool_size)
+        self.ids = itertools.count(1)
+
+    def _connect(self):
+        if self.https:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _post(self, payload: bytes):
+        for attempt in itertools.count():
+            try:
+                return self._post_once(payload)
+            except (RpcError, OSError, http.client.HTTPException) as e:
+                if attempt >= self.retries or not retry.is_transient_error(e):
+                    raise
+            time.sleep(retry.backoff(attempt, self.backoff))
+
+    def _post_once(self, payload: bytes):
+        with self.slots:
+            with self.lock:
+                conn = self.idle.pop() if self.idle else None
+
+            # A pooled connection may have been closed by the server in the meantime, so retry once on a new one.
+            for attempt in range(2):
+                if conn is None:
+                    conn = self._connect()
+                try:
+                    conn.request(
+                        "POST",
+                        self.path,
+                        payload,
+                        {"Content-Type": "application/json", "Connection": "keep-alive"},
+                    )
+                    response = conn.getresponse()
+                    body = response.read()
+                    break
+                except (http.client.HTTPException, ConnectionError):
+                    conn.close()
+                    conn = None
+                    if attempt:
+                        raise
+
+            if response.status != 200:
+                conn.close()
+                raise RpcError(response.status, body.decode(errors="replace"))
+
+            with self.lock:
+                self.idle.append(conn)
+
+        return json.loads(body)
+
+    def call(self, method: str, params: list = []):
+        for attempt in itertools.count():
+            response = self._post(
+                json.dumps(
+                    {"jsonrpc": "2.0", "id": next(self.ids), "method": method, "params": params}
+                ).encode()
+            )
+            if "result" in response or "error" not in response:
+                return response["result"]
+
+            error = response["error"]
+            error = RpcError(error.get("code"), error.get("message"), error.get("data"))
+            # eg. "rate limit exceeded" as a JSON-RPC error
+            if attempt >= self.retries or not retry.is_transient_error(error):
+                raise error
+            time.sleep(retry.backoff(attempt, self.backoff))
+
+    def batch(self, calls: list, errors: bool = False) -> list:
+        """
+        Sends `[(method, params), ...]` as a single JSON-RPC batch and returns the results in order.
+        With `errors=True`, failed calls return their `RpcError` instead of raising it.
+        """
+        requests = [
+            {"jsonrpc": "2.0", "id": next(self.ids), "method": method, "params": params}
+            for method, params in calls
+        ]
+        responses = {r["id"]: r for r in self._post(json.dumps(requests).encode())}
+
+        results = []
+        for request in requests:
+            response = responses[request["id"]]
+            if "error" in response:
+                error = response["error"]
+                error = RpcError(error.get("code"), error.get("message"), error.get("data"))
+                if not errors:
+                    raise error
+                results.append(error)
+            else:
+                results.append(response["result"])
+        return results
+
+    def close(self):
+        with self.lock:
+            for conn in self.idle:
+                conn.close()
+            self.idle = []
+
+
+###########################
+# Backend
+###########################
+
+
+class RpcBackend:
+    """
+    Sends transactions straight over JSON-RPC, signing them locally, instead of spawning `cast send`.
+
+    Deployments send the artifact's `bytecode.object` with the constructor arguments ABI encoded in-process,
+    so nothing is spawned either, once `forge build` ran (see `Deployer.build`, implied by these deploys). Contracts that need library linking, or every contract with
+    `bytecode_deploys=False`, still go through `forge create`.
+
+    Nonces come from a `NonceManager` shared by every backend using the same signer and RPC. With
+    `pipeline=True`, sends return as soon as they are broadcast and their receipts are checked on `flush`
+    (called by `Deployer.path` at the end, and before every `forge create`). Deployments wait for their
+    receipt, since later actions need the address, unless `predict_addresses=True`: the address is then
+    derived from the sender and nonce (see `eth.create_address`), so the deployments that use it can be
+    broadcast right after. Every prediction is checked against the receipt on `flush`.
+
+    Transactions are sent from the signer of the action's lane (see `Deployer(signers=...)`), the
+    deployer's signer otherwise. Only `KeyKind.PRIVATE` signers are supported.
+
+    Example:
+        deployer = Deployer(Network.LOCAL, TEST_SIGNER, contracts, is_legacy=True, backend=RpcBackend)
+    """
+
+    def __init__(
+        self,
+        deployer,
+        pool_size: int = 4,
+        poll_interval: float = 0.5,
+        receipt_timeout: float = 300,
+        rebroadcast_after: float = 30,
+        pipeline: bool = False,
+        bytecode_deploys: bool = True,
+        predict_addresses: bool = False,
+    ):
+        self.deployer = deployer
+        self.client = RpcClient(rpc_url(deployer.rpc), pool_size)
+        self.legacy = bool(deployer.is_legacy)
+        self.poll_interval = poll_interval
+        self.receipt_timeout = receipt_timeout
+        self.rebroadcast_after = rebroadcast_after
+        self.pipeline = pipeline
+        self.bytecode_deploys = bytecode_deploys
+        self.predict_addresses = pipeline and predict_addresses
+        self.chain_id = None
+
+        self.pending = []
+        self.lock = threading.Lock()
+        self.accounts = {}
+        self.private_key, self.address, self.nonces = self.account(deployer.signer)
+
+    def account(self, signer=None) -> tuple:
+        """
+        `(private_key, address, nonces)` of `signer`, by default the one of the current lane.
+        """
+        signer = signer or current_signer() or self.deployer.signer
+        with self.lock:
+            if id(signer) not in self.accounts:
+                if signer.key_kind != KeyKind.PRIVATE:
+                    raise ValueError("RpcBackend only supports KeyKind.PRIVATE signers")
+
+                private_key = to_bytes(signer.key_argument)
+                address = private_key_to_address(private_key)
+                nonces = NonceManager.get(
+                    self.client.url, address, lambda: self._fetch_nonce(address)
+                )
+                self.accounts[id(signer)] = (private_key, address, nonces)
+
+            return self.accounts[id(signer)]
+
+    ###########################
+    # Transactions
+    ###########################
+
+    def _fetch_nonce(self, address: str) -> int:
+        return int(self.client.call("eth_getTransactionCount", [address, "pending"]), 16)
+
+    def balance(self, address: str) -> int:
+        return int(self.client.call("eth_getBalance", [address, "latest"]), 16)
+
+    def _build(
+        self, sender: str, to: str, data: bytes, nonce: int, gas: int = None, value: int = 0
+    ) -> dict:
+        """
+        Fills in chain id, fees and gas with a single batched request.
+        """
+        calls = []
+        if gas is None:
+            estimate = {"from": sender, "data": "0x" + data.hex(), "value": hex(value)}
+            if to:
+                estimate["to"] = to
+            calls.append(("eth_estimateGas", [estimate]))
+        if self.chain_id is None:
+            calls.append(("eth_chainId", []))
+        if self.legacy:
+            calls.append(("eth_gasPrice", []))
+        else:
+            calls.append(("eth_getBlockByNumber", ["latest", False]))
+            calls.append(("eth_maxPriorityFeePerGas", []))
+
+        results = self.client.batch(calls)
+        if gas is None:
+            gas = int(results.pop(0), 16)
+        if self.chain_id is None:
+            self.chain_id = int(results.pop(0), 16)
+
+        tx = {
+            "chainId": self.chain_id,
+            "nonce": nonce,
+            "gas": gas,
+            "to": to,
+            "value": value,
+            "data": data,
+        }
+        if self.legacy:
+            tx["gasPrice"] = int(results[-1], 16)
+        else:
+            priority_fee = int(results[-1], 16)
+            base_fee = int(results[-2]["baseFeePerGas"], 16)
+            tx["maxPriorityFeePerGas"] = priority_fee
+            tx["maxFeePerGas"] = 2 * base_fee + priority_fee
+        return tx
+
+    def _send_raw(self, raw: bytes) -> str:
+        tx_hash = "0x" + keccak256(raw).hex()
+        try:
+            self.client.call("eth_sendRawTransaction", ["0x" + raw.hex()])
+        except RpcError as e:
+            message = (e.message or "").lower()
+            # The very same transaction is already in the pool
+            if "already known" in message:
+                return tx_hash
+            # A retried request whose first attempt got through, and was mined in the meantime
+            if "nonce too low" in message and self.client.call("eth_getTransactionByHash", [tx_hash]):
+                return tx_hash
+            raise
+        return tx_hash
+
+    def broadcast(
+        self, to: str, data: bytes, gas: int = None, nonce: int = None, value: int = 0, account=None
+    ) -> tuple:
+        """
+        Signs and broadcasts a transaction with a locally allocated nonce. Returns `(tx_hash, raw, nonce)`.
+        `account` defaults to the one of the current lane (see `account`).
+
+        On "nonce too low" (key used elsewhere) the nonce is resynced from chain, and on "nonce too high"
+        (a gap below us) the gaps are filled, before trying again. A nonce given back below ones already handed
+        out (eg. gas estimation reverted) is filled right away, so the transactions after it aren't stuck.
+        """
+        private_key, address, nonces = account or self.account()
+        for attempt in range(3):
+            allocated = nonce is None
+            if allocated:
+                nonce = nonces.allocate()
+            try:
+                tx = self._build(address, to, data, nonce, gas, value)
+                raw = sign_transaction(tx, private_key)
+                return self._send_raw(raw), raw, nonce
+            except RpcError as e:
+                if not allocated:
+                    raise
+
+                message = (e.message or "").lower()
+                if "nonce too low" in message:
+                    nonces.resync()
+                elif nonces.release(nonce) or "nonce too high" in message:
+                    self.fill_gaps()
+
+                if attempt == 2 or "nonce too" not in message:
+                    raise
+                nonce = None
+            except BaseException:
+                if allocated and nonces.release(nonce):
+                    self.fill_gaps()
+                raise
+
+    def fill_gaps(self):
+        """
+        Uses up released nonces with empty self transfers, so the transactions after them can be mined.
+        """
+        with self.lock:
+            accounts = list(self.accounts.values())
+
+        for account in accounts:
+            _, address, nonces = account
+            for nonce in nonces.take_gaps():
+                print(f"Filling nonce gap | {address} {nonce}")
+                tx_hash, raw, _ = self.broadcast(address, b"", gas=21000, nonce=nonce, account=account)
+                with self.lock:
+                    self.pending.append((tx_hash, raw, f"fill nonce gap {address} {nonce}", None))
+
+    @timing.timed("receipt")
+    def wait_for_receipt(self, tx_hash: str, raw: bytes = None) -> dict:
+        """
+        Polls for the receipt. If the node no longer knows the transaction (dropped from the pool),
+        `raw` is broadcast again.
+        """
+        deadline = time.monotonic() + self.receipt_timeout
+        last_check = time.monotonic()
+        while True:
+            receipt = self.client.call("eth_getTransactionReceipt", [tx_hash])
+            if receipt is not None:
+                return receipt
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"no receipt for {tx_hash} after {self.receipt_timeout}s")
+            if self.deployer.cancelled.is_set():
+                raise Cancelled(f"stopped waiting for {tx_hash}")
+
+            if raw is not None and time.monotonic() - last_check > self.rebroadcast_after:
+                last_check = time.monotonic()
+                if self.client.call("eth_getTransactionByHash", [tx_hash]) is None:
+                    print(f"Rebroadcasting | {tx_hash}")
+                    self._send_raw(raw)
+
+            time.sleep(self.poll_interval)
+
+    def _check_receipt(self, receipt: dict, description: str):
+        if int(receipt["status"], 16) != 1:
+            self.deployer.fail(description, json.dumps(receipt, indent=2))
+
+    def transact(
+        self, to: str, data: bytes, description: str, value: int = 0, wait: bool = False
+    ) -> Receipt:
+        """
+        Signs, broadcasts and (unless pipelining, and not `wait`) waits for a transaction.
+        Failures are handled like a failed `forge`/`cast` call.
+
+        Pipelined transactions return a `Receipt` with only the hash, filled in on `flush`. Pipelined
+        contract creations also have their predicted address.
+        """
+        account = self.account()
+        try:
+            tx_hash, raw, nonce = self._broadcast_after_pending(to, data, value, account)
+            if self.pipeline and not wait:
+                result = Receipt(tx_hash)
+                if to is None:
+                    result.address = create_address(account[1], nonce)
+                    result.predicted = True
+                with self.lock:
+                    self.pending.append((tx_hash, raw, description, result))
+                return result
+
+            receipt = self.wait_for_receipt(tx_hash, raw)
+        except (RpcError, TimeoutError, OSError) as e:
+            self.deployer.fail(description, str(e))
+
+        self._check_receipt(receipt, description)
+        return Receipt.from_json(receipt)
+
+    def _broadcast_after_pending(self, to: str, data: bytes, value: int, account: tuple) -> tuple:
+        """
+        `broadcast`, waiting for the pipelined transactions first if gas estimation reverts: the
+        transaction may depend on them (eg. a constructor calling a contract whose address was predicted).
+        """
+        try:
+            return self.broadcast(to, data, value=value, account=account)
+        except RpcError as e:
+            with self.lock:
+                pending = bool(self.pending)
+            if not pending or "revert" not in (e.message or "").lower():
+                raise
+
+        self.deployer.flush()
+        return self.broadcast(to, data, value=value, account=account)
+
+    def flush(self):
+        """
+        Waits for every pipelined transaction, checks it succeeded, and that predicted addresses are right.
+        """
+        try:
+            self.fill_gaps()
+        except (RpcError, OSError) as e:
+            self.deployer.fail("fill nonce gaps", str(e))
+
+        with self.lock:
+            pending, self.pending = self.pending, []
+
+        for tx_hash, raw, description, result in pending:
+            try:
+                receipt = self.wait_for_receipt(tx_hash, raw)
+            except (RpcError, TimeoutError, OSError) as e:
+                self.deployer.fail(description, str(e))
+            self._check_receipt(receipt, description)
+            if result is None:
+                continue
+
+            predicted = result.address if result.predicted else None
+            result.fill(receipt)
+            if predicted and predicted.lower() != (result.address or "").lower():
+                self.deployer.fail(
+                    description, f"predicted address {predicted}, deployed at {result.address}"
+                )
+            if predicted:
+                result.address = predicted
+            result.predicted = False
+
+    ###########################
+    # Backend interface
+    ###########################
+
+    def deploy(self, contract_label: str, args: list) -> Receipt:
+        deployer = self.deployer
+
+        receipt = self.deploy_bytecode(contract_label, args)
+        if receipt is not None:
+            return receipt
+
+        # `forge create` reads the nonce from the node, so every pipelined transaction has to land first
+        deployer.flush()
+        return deployer._transact(deployer._deploy_cmd(contract_label, args), deployer.DEPLOY)
+
+    def deploy_bytecode(self, contract_label: str, args: list) -> Receipt:
+        """
+        Deploys the artifact's bytecode. None if it needs `forge create` instead (library linking,
+        or `bytecode_deploys=False`).
+        """
+        if not self.bytecode_deploys:
+            return None
+        if not self.deployer.built:
+            # Deployed outside of `Deployer.path`: `out/` may be stale
+            self.deployer.build()
+        bytecode, types = self.deployer._creation_code(contract_label)
+        if "__$" in bytecode:
+            return None
+        return self.create(contract_label, bytecode, types, args)
+
+    def create(self, contract_label: str, bytecode: str, types: list, args: list) -> Receipt:
+        """
+        Sends a contract creation transaction with `bytecode` and the ABI encoded constructor `args`.
+        """
+        deployer = self.deployer
+        with timing.phase("args"):
+            data = to_bytes(bytecode) + abi.encode(types, [deployer._handle_arg(arg) for arg in args])
+
+        with timing.phase("rpc"):
+            receipt = self.transact(
+                None, data, f"deploy ${contract_label} {args}", wait=not self.predict_addresses
+            )
+
+        if not receipt.address:
+            deployer.fail(f"deploy ${contract_label}", json.dumps(receipt.to_dict(), indent=2))
+        receipt.address = to_checksum_address(receipt.address)
+        return receipt
+
+    def send(self, address: str, signature: str, args: list) -> Receipt:
+        data = abi.encode_call(signature, args)
+        return self.transact(address, data, f"send {address} {signature} {args}")
+
+    def send_data(self, address: str, data: bytes) -> Receipt:
+        """
+        Sends raw calldata (eg. a salt and init code to the CREATE2 factory).
+        """
+        return self.transact(address, data, f"send {address} 0x{data[:4].hex()}... ({len(data)} bytes)")
+
+    def transfer(self, address: str, value: int) -> str:
+        receipt = self.transact(address, b"", f"transfer {value} wei to {address}", value)
+        return receipt.tx_hash
@@ -0,0 +1,261 @@
+import json, os, sqlite3, threading, time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS networks (
+    network TEXT PRIMARY KEY,
+    rpc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contracts (
+    network TEXT NOT NULL,
+    label TEXT NOT NULL,
+    contract_path TEXT NOT NULL,
+    PRIMARY KEY (network, label)
+);
+CREATE TABLE IF NOT EXISTS addresses (
+    network TEXT NOT NULL,
+    label TEXT NOT NULL,
+    address TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (network, label)
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    network TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    label TEXT NOT NULL,
+    action INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (network, tx_hash)
+);
+CREATE INDEX IF NOT EXISTS transactions_label ON transactions (network, label);
+CREATE TABLE IF NOT EXISTS sends (
+    network TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    label TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (network, fingerprint)
+);
+CREATE TABLE IF NOT EXISTS receipts (
+    network TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    label TEXT NOT NULL,
+    action INTEGER NOT NULL,
+    address TEXT,
+    gas_used INTEGER,
+    effective_gas_price INTEGER,
+    block_number INTEGER,
+    status INTEGER,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (network, tx_hash)
+);
+CREATE INDEX IF NOT EXISTS receipts_label ON receipts (network, label);
+CREATE TABLE IF NOT EXISTS unfinished (
+    network TEXT NOT NULL,
+    path TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    action INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (network, path, step)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    signatures TEXT NOT NULL
+);
+"""
+
+
+class StateStore:
+    """
+    SQLite (WAL mode) store for the deployment state of every network, shared by all deploy scripts
+    using the same cache folder.
+
+    Rows are written one by one as they change, so concurrent scripts never overwrite each other's
+    state with a stale copy, and readers are never blocked by writers.
+    """
+
+    def __init__(self, db_path: str, timeout: float = 30):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(
+            db_path, timeout=timeout, check_same_thread=False, isolation_level=None
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        with self.lock:
+            self.db.executescript(SCHEMA)
+
+    def _write(self, sql: str, rows: list):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.executemany(sql, rows)
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def _read(self, sql: str, params: tuple = ()) -> list:
+        with self.lock:
+            return self.db.execute(sql, params).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    ###########################
+    # Networks
+    ###########################
+
+    def add_network(self, network: str, rpc: str):
+        self._write("INSERT OR IGNORE INTO networks (network, rpc) VALUES (?, ?)", [(network, rpc)])
+
+    def has_network(self, network: str) -> bool:
+        return bool(self._read("SELECT 1 FROM networks WHERE network = ?", (network,)))
+
+    ###########################
+    # Labels
+    ###########################
+
+    def contracts(self, network: str) -> dict:
+        return dict(
+            self._read("SELECT label, contract_path FROM contracts WHERE network = ?", (network,))
+        )
+
+    def set_contracts(self, network: str, contracts: dict):
+        self._write(
+            "INSERT OR REPLACE INTO contracts (network, label, contract_path) VALUES (?, ?, ?)",
+            [(network, label, path) for label, path in contracts.items()],
+        )
+
+    def addresses(self, network: str) -> dict:
+        return dict(self._read("SELECT label, address FROM addresses WHERE network = ?", (network,)))
+
+    def set_addresses(self, network: str, addresses: dict):
+        now = time.time()
+        self._write(
+            "INSERT OR REPLACE INTO addresses (network, label, address, updated_at) VALUES (?, ?, ?, ?)",
+            [(network, label, address, now) for label, address in addresses.items()],
+        )
+
+    ###########################
+    # Transactions
+    ###########################
+
+    def add_transaction(self, network: str, tx_hash: str, label: str, action: int):
+        self._write(
+            "INSERT OR REPLACE INTO transactions (network, tx_hash, label, action, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(network, tx_hash, label, action, time.time())],
+        )
+
+    def transactions(self, network: str, label: str) -> list:
+        return [
+            row[0]
+            for row in self._read(
+                "SELECT tx_hash FROM transactions WHERE network = ? AND label = ? ORDER BY created_at",
+                (network, label),
+            )
+        ]
+
+    def sent(self, network: str, fingerprint: str) -> str:
+        """
+        Transaction hash of a memoized SEND, or None.
+        """
+        rows = self._read(
+            "SELECT tx_hash FROM sends WHERE network = ? AND fingerprint = ?",
+            (network, fingerprint),
+        )
+        return rows[0][0] if rows else None
+
+    def add_send(self, network: str, fingerprint: str, label: str, tx_hash: str):
+        self._write(
+            "INSERT OR REPLACE INTO sends (network, fingerprint, label, tx_hash, created_at) VALUES (?, ?, ?, ?, ?)",
+            [(network, fingerprint, label, tx_hash, time.time())],
+        )
+
+    def add_receipt(self, network: str, label: str, action: int, receipt: dict):
+        """
+        Stores the receipt of a transaction (see `receipt.Receipt.to_dict`).
+        """
+        self._write(
+            "INSERT OR REPLACE INTO receipts (network, tx_hash, label, action, address, gas_used, "
+            "effective_gas_price, block_number, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    network,
+                    receipt["tx_hash"],
+                    label,
+                    action,
+                    receipt["address"],
+                    receipt["gas_used"],
+                    receipt["effective_gas_price"],
+                    receipt["block_number"],
+                    receipt["status"],
+                    time.time(),
+                )
+            ],
+        )
+
+    def receipts(self, network: str, label: str) -> list:
+        """
+        Receipts of `label`'s transactions, oldest first, as dicts.
+        """
+        columns = ["tx_hash", "action", "address", "gas_used", "effective_gas_price", "block_number", "status"]
+        rows = self._read(
+            f"SELECT {', '.join(columns)} FROM receipts WHERE network = ? AND label = ? ORDER BY created_at",
+            (network, label),
+        )
+        return [dict(zip(columns, row)) for row in rows]
+
+    def add_unfinished(self, network: str, path: str, step: int, label: str, action: int, reason: str):
+        """
+        Records a step that was interrupted while running (timed out, cancelled, failed).
+        """
+        self._write(
+            "INSERT OR REPLACE INTO unfinished (network, path, step, label, action, reason, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(network, path, step, label, action, reason, time.time())],
+        )
+
+    def unfinished(self, network: str, path: str) -> list:
+        """
+        `[(step, label, action, reason), ...]` of the steps of `path` that didn't finish.
+        """
+        return self._read(
+            "SELECT step, label, action, reason FROM unfinished WHERE network = ? AND path = ? ORDER BY step",
+            (network, path),
+        )
+
+    def clear_unfinished(self, network: str, path: str):
+        self._write("DELETE FROM unfinished WHERE network = ? AND path = ?", [(network, path)])
+
+    ###########################
+    # Signatures
+    ###########################
+
+    def artifact(self, path: str) -> dict:
+        rows = self._read(
+            "SELECT mtime, size, sha256, signatures FROM artifacts WHERE path = ?", (path,)
+        )
+        if not rows:
+            return None
+        mtime, size, sha256, signatures = rows[0]
+        return {
+            "mtime": mtime,
+            "size": size,
+            "sha256": sha256,
+            "signatures": json.loads(signatures),
+        }
+
+    def set_artifacts(self, entries: dict):
+        self._write(
+            "INSERT OR REPLACE INTO artifacts (path, mtime, size, sha256, signatures) VALUES (?, ?, ?, ?, ?)",
+            [
+                (path, e["mtime"], e["size"], e["sha256"], json.dumps(e["signatures"]))
+                for path, e in entries.items()
+            ],
+        )
@@ -0,0 +1,196 @@
+import contextlib, contextvars, functools, json, threading, time
+
+# Phases of an action, in the order they happen. `receipt` is part of `rpc`.
+PHASES = ["queue", "args", "spawn", "subprocess", "rpc", "receipt", "parse", "cache_save"]
+
+# `(timings, record)` of the action running in this thread/task, if any
+_current = contextvars.ContextVar("foundrydeploy_action", default=None)
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    """
+    Adds the time spent in the block to phase `name` of the current action.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        current = _current.get()
+        if current is not None:
+            timings, record = current
+            end = time.perf_counter()
+            record[name] += end - start
+            timings._span(name, "phase", start, end, record["lane"])
+
+
+def timed(name: str):
+    """
+    Decorator version of `phase`.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def note(**fields):
+    """
+    Adds fields (eg. `tx_hash`) to the current action.
+    """
+    current = _current.get()
+    if current is not None:
+        current[1].update(fields)
+
+
+class Timings:
+    """
+    Times every action of a path, split in `PHASES`, and writes them as JSON lines to `path`:
+
+        {"step": 3, "action": "SEND", "label": "B", "tx_hash": "0x..", "skipped": false, "lane": 0,
+         "queue": 0.0, "args": 0.0001, "spawn": 0.002, "subprocess": 1.3, "rpc": 0.0, "receipt": 0.0,
+         "parse": 0.00001, "cache_save": 0.004, "wall": 1.31}
+
+    `summary` prints where the time went once the path is done.
+
+    With a `trace` file, every action and phase is also kept as a span and written in Chrome trace-event
+    format (open in `chrome://tracing` or https://ui.perfetto.dev). Actions running at the same time are
+    laid out in separate lanes: each action takes the lowest lane that is free when it starts.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.records = []
+        self.f = None
+        self.trace = None
+        self.events = []
+        self.lanes = []
+        self.lane_count = 0
+        self.t0 = time.perf_counter()
+
+    def start(self, trace: str = None):
+        with self.lock:
+            self.records = []
+            if self.f is not None:
+                self.f.close()
+            self.f = open(self.path, "w")
+
+            self.trace = trace
+            self.events = []
+            self.lanes = []
+            self.lane_count = 0
+            self.t0 = time.perf_counter()
+
+    def _take_lane(self) -> int:
+        with self.lock:
+            if self.lanes:
+                self.lanes.sort()
+                return self.lanes.pop(0)
+            self.lane_count += 1
+            return self.lane_count - 1
+
+    def _release_lane(self, lane: int):
+        with self.lock:
+            self.lanes.append(lane)
+
+    def _span(self, name: str, category: str, start: float, end: float, lane: int, args: dict = None):
+        if self.trace is None:
+            return
+
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.t0) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": 0,
+            "tid": lane,
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def action(self, step: int, action: str, contract_label: str):
+        record = {
+            "step": step,
+            "action": action,
+            "label": contract_label,
+            "tx_hash": None,
+            "skipped": False,
+            "lane": self._take_lane(),
+        }
+        record.update((name, 0.0) for name in PHASES)
+
+        token = _current.set((self, record))
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            record["wall"] = end - start
+            _current.reset(token)
+            self._release_lane(record["lane"])
+
+            args = {key: record[key] for key in ("step", "tx_hash", "skipped", "error") if key in record}
+            self._span(f"{action} ${contract_label}", "action", start, end, record["lane"], args)
+            self._write(record)
+
+    def _write(self, record: dict):
+        with self.lock:
+            self.records.append(record)
+            if self.f is not None:
+                self.f.write(json.dumps(record) + "\n")
+                self.f.flush()
+
+    def write_trace(self):
+        """
+        Writes the spans collected so far to the `trace` file given to `start`, if any.
+        """
+        with self.lock:
+            if self.trace is None:
+                return
+            events = list(self.events)
+            lanes = self.lane_count
+
+        names = [
+            {"name": "thread_name", "ph": "M", "pid": 0, "tid": lane, "args": {"name": f"lane {lane}"}}
+            for lane in range(lanes)
+        ]
+        with open(self.trace, "w") as f:
+            json.dump({"traceEvents": names + events, "displayTimeUnit": "ms"}, f)
+
+        print(f"# Trace written to `{self.trace}`")
+
+    def summary(self, slowest: int = 5):
+        with self.lock:
+            records = list(self.records)
+            if self.f is not None:
+                self.f.close()
+                self.f = None
+
+        if not records:
+            return
+
+        executed = [r for r in records if not r["skipped"]]
+        print(f"\n## Timings: {len(executed)} executed, {len(records) - len(executed)} skipped ({self.path})")
+        print(f"{'phase':<12} | {'total':>9} | {'mean':>9} | {'max':>9}")
+        for name in PHASES + ["wall"]:
+            values = [r[name] for r in executed] or [0.0]
+            print(
+                f"{name:<12} | {sum(values):>8.3f}s | {sum(values) / len(values):>8.3f}s | {max(values):>8.3f}s"
+            )
+
+        for r in sorted(executed, key=lambda r: r["wall"], reverse=True)[:slowest]:
+            print(f"  {r['wall']:>8.3f}s | step {r['step']} {r['action']} ${r['label']} {r['tx_hash'] or ''}")
@@ -0,0 +1,130 @@
+import pytest
+from foundrydeploy import abi
+
+
+def words(data: bytes) -> list:
+    return [data[i : i + 32].hex() for i in range(0, len(data), 32)]
+
+
+def word(value: int) -> str:
+    return value.to_bytes(32, "big").hex()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("12", 12),
+        ("0x10", 16),
+        ("-0x10", -16),
+        ("1ether", 10**18),
+        ("1.5ether", 15 * 10**17),
+        ("1gwei", 10**9),
+        ("2 gwei", 2 * 10**9),
+        ("7wei", 7),
+        (5, 5),
+        (True, 1),
+    ],
+)
+def test_parse_int(value, expected):
+    assert abi.parse_int(value) == expected
+
+
+def test_parse_signature():
+    assert abi.parse_signature("f(uint256,(address,bytes)[],bool)") == (
+        "f",
+        ["uint256", "(address,bytes)[]", "bool"],
+    )
+    assert abi.parse_signature("f()") == ("f", [])
+
+
+def test_selector():
+    assert abi.selector("transfer(address,uint256)").hex() == "a9059cbb"
+    assert abi.selector("aggregate3((address,bool,bytes)[])").hex() == "82ad56cb"
+
+
+def test_encode_static():
+    assert words(abi.encode(["uint256", "bool", "address"], ["1gwei", "true", "0x" + "aa" * 20])) == [
+        word(10**9),
+        word(1),
+        "00" * 12 + "aa" * 20,
+    ]
+    assert words(abi.encode(["int8"], ["-1"])) == ["ff" * 32]
+    assert words(abi.encode(["bytes4"], ["0x01020304"])) == ["01020304" + "00" * 28]
+
+
+def test_encode_dynamic():
+    assert words(abi.encode(["string", "uint256[]"], ["hi", "[1,2]"])) == [
+        word(0x40),
+        word(0x80),
+        word(2),
+        "6869" + "00" * 30,
+        word(2),
+        word(1),
+        word(2),
+    ]
+
+
+def test_encode_tuples():
+    # Static tuple: inline
+    assert words(abi.encode(["(uint256,bool)"], ["(1,true)"])) == [word(1), word(1)]
+
+    # Dynamic tuple with a nested array of dynamic tuples
+    encoded = abi.encode(
+        ["(uint256,address,(uint8,string)[])"],
+        ["(1,0x00000000000000000000000000000000000000aa,[(2,hi),(3,yo)])"],
+    )
+    assert words(encoded) == [
+        word(0x20),
+        word(1),
+        word(0xAA),
+        word(0x60),
+        word(2),
+        word(0x40),
+        word(0xC0),
+        word(2),
+        word(0x40),
+        word(2),
+        "6869" + "00" * 30,
+        word(3),
+        word(0x40),
+        word(2),
+        "796f" + "00" * 30,
+    ]
+
+
+def test_encode_fixed_array_of_tuples():
+    assert words(abi.encode(["(uint256,bool)[2]"], ["[(1,true),(2,false)]"])) == [
+        word(1),
+        word(1),
+        word(2),
+        word(0),
+    ]
+
+
+def test_encode_call():
+    data = abi.encode_call("transfer(address,uint256)", ["0x" + "11" * 20, "1ether"])
+    assert data[:4].hex() == "a9059cbb"
+    assert words(data[4:]) == ["00" * 12 + "11" * 20, word(10**18)]
+
+
+@pytest.mark.parametrize(
+    "abi_type, value",
+    [
+        ("uint8", "256"),
+        ("uint256", "-1"),
+        ("int8", "128"),
+        ("int8", "-129"),
+        ("address", "0x" + "aa" * 19),
+        ("address", "0x" + "aa" * 21),
+        ("bytes2", "0x010203"),
+        ("tuple", "(1)"),
+    ],
+)
+def test_encode_rejects(abi_type, value):
+    with pytest.raises(ValueError):
+        abi.encode_single(abi_type, value)
+
+
+def test_encode_argument_count():
+    with pytest.raises(ValueError):
+        abi.encode(["uint256", "uint256"], ["1"])
@@ -0,0 +1,125 @@
+import io, json, os
+import pytest
+from foundrydeploy import artifacts
+from foundrydeploy.store import StateStore
+
+ARTIFACT = {
+    "abi": [
+        {
+            "type": "constructor",
+            "inputs": [
+                {
+                    "name": "config",
+                    "type": "tuple",
+                    "components": [
+                        {"name": "owner", "type": "address"},
+                        {
+                            "name": "fees",
+                            "type": "tuple[]",
+                            "components": [{"name": "bps", "type": "uint16"}, {"name": "to", "type": "address"}],
+                        },
+                    ],
+                },
+                {"name": "name", "type": "string"},
+            ],
+        },
+        {
+            "type": "function",
+            "name": "transfer",
+            "inputs": [{"name": "to", "type": "address"}, {"name": "amount", "type": "uint256"}],
+        },
+        {"type": "event", "name": "Transfer", "inputs": []},
+    ],
+    "bytecode": {"object": "0x6080", "sourceMap": "1:2:3"},
+    # Brackets, braces and escaped quotes inside strings must not confuse the scanner
+    "metadata": {"note": 'a "quoted" {string} with [brackets] \\ and \\"', "list": [1, -2.5e3, True, None, {}]},
+    "deployedBytecode": {"object": "0x" + "ab" * 300},
+}
+
+
+class Trickle(io.BytesIO):
+    """
+    Returns at most `size` bytes per read, so values straddle chunk boundaries.
+    """
+
+    def __init__(self, data: bytes, size: int):
+        super().__init__(data)
+        self.size = size
+
+    def read(self, n=-1):
+        return super().read(self.size)
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / "Token.json"
+    path.write_text(json.dumps(ARTIFACT, indent=2))
+    return str(path)
+
+
+def test_artifact_path():
+    assert artifacts.artifact_path("src/tokens/Token.sol:Token") == "out/Token.sol/Token.json"
+    with pytest.raises(ValueError):
+        artifacts.artifact_path("src/Token:Token")
+
+
+def test_read_fields(artifact):
+    fields = artifacts.read_fields(artifact, ["deployedBytecode", "abi", "metadata"])
+    assert fields == {key: ARTIFACT[key] for key in ["deployedBytecode", "abi", "metadata"]}
+
+
+def test_read_fields_missing(artifact):
+    with pytest.raises(KeyError):
+        artifacts.read_fields(artifact, ["abi", "storageLayout"])
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_read_fields_across_chunks(artifact, monkeypatch, size):
+    data = open(artifact, "rb").read()
+    monkeypatch.setattr(artifacts, "open", lambda path, mode: Trickle(data, size), raising=False)
+
+    assert artifacts.read_fields(artifact, ["metadata", "deployedBytecode"]) == {
+        "metadata": ARTIFACT["metadata"],
+        "deployedBytecode": ARTIFACT["deployedBytecode"],
+    }
+
+
+def test_input_type():
+    constructor = ARTIFACT["abi"][0]
+    assert [artifacts.input_type(inp) for inp in constructor["inputs"]] == [
+        "(address,(uint16,address)[])",
+        "string",
+    ]
+
+
+def test_function_signatures():
+    assert artifacts.function_signatures(ARTIFACT["abi"]) == {"transfer": "transfer(address,uint256)"}
+
+
+def test_creation_code(artifact):
+    assert artifacts.creation_code(artifact) == ("0x6080", ["(address,(uint16,address)[])", "string"])
+
+
+def test_index(artifact, tmp_path):
+    store = StateStore(str(tmp_path / "state.sqlite"))
+    index = artifacts.ArtifactIndex(store)
+    assert index.signatures(artifact) == {"transfer": "transfer(address,uint256)"}
+    index.save()
+
+    entry = store.artifact(artifact)
+    assert entry["sha256"] == artifacts.INDEX_VERSION + artifacts.file_digest(artifact)
+    assert artifacts.ArtifactIndex(store).signatures(artifact) == entry["signatures"]
+
+
+def test_index_reparses_older_versions(artifact, tmp_path):
+    store = StateStore(str(tmp_path / "state.sqlite"))
+    stat = os.stat(artifact)
+    stale = {
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": artifacts.file_digest(artifact),
+        "signatures": {"transfer": "transfer(tuple)"},
+    }
+    store.set_artifacts({artifact: stale})
+
+    assert artifacts.ArtifactIndex(store).signatures(artifact) == {"transfer": "transfer(address,uint256)"}
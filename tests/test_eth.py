@@ -0,0 +1,134 @@
+import pytest
+from foundrydeploy.eth import (
+    create2_address,
+    create_address,
+    keccak256,
+    private_key_to_address,
+    rlp_encode,
+    sign_transaction,
+    to_bytes,
+    to_checksum_address,
+)
+
+# Private key of the EIP-155 example
+KEY = bytes.fromhex("46" * 32)
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b"", "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"),
+        (b"abc", "4e03657aea45a94fc7d47ba826c8d667c0d1e6e33a64a036ec44f58fa12d6c45"),
+        # Exactly one block (136 bytes), so the padding takes a block of its own
+        (b"a" * 136, "a6c4d403279fe3e0af03729caada8374b5ca54d8065329a3ebcaeb4b60aa386e"),
+    ],
+)
+def test_keccak256(data, expected):
+    assert keccak256(data).hex() == expected
+
+
+@pytest.mark.parametrize(
+    "item, expected",
+    [
+        (b"", "80"),
+        (b"\x0f", "0f"),
+        (b"\x80", "8180"),
+        (0, "80"),
+        (1024, "820400"),
+        ([], "c0"),
+        ([b"cat", b"dog"], "c88363617483646f67"),
+        ([0, 1024, []], "c580820400c0"),
+        (b"a" * 56, "b838" + "61" * 56),
+    ],
+)
+def test_rlp_encode(item, expected):
+    assert rlp_encode(item).hex() == expected
+
+
+def test_to_bytes():
+    assert to_bytes("0x0102") == b"\x01\x02"
+    assert to_bytes("102") == b"\x01\x02"
+
+
+def test_checksum_address():
+    # EIP-55
+    assert (
+        to_checksum_address("0x5aaeb6053f3e94c9b9a09f33669435e7ef1beaed")
+        == "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+    )
+    assert (
+        to_checksum_address(bytes.fromhex("fb6916095ca1df60bb79ce92ce3ea74c37c5d359"))
+        == "0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359"
+    )
+
+
+def test_private_key_to_address():
+    assert private_key_to_address(KEY) == "0x9d8A62f656a8d1615C1294fd71e9CFb3E4855A4F"
+
+
+def test_sign_legacy_transaction():
+    # EIP-155 example
+    tx = {
+        "chainId": 1,
+        "nonce": 9,
+        "gasPrice": 20 * 10**9,
+        "gas": 21000,
+        "to": "0x" + "35" * 20,
+        "value": 10**18,
+    }
+    assert sign_transaction(tx, KEY).hex() == (
+        "f86c098504a817c800825208943535353535353535353535353535353535353535880de0b6b3a76400008025a028ef61340bd939"
+        "bc2195fe537567866003e1a15d3c71ff63e1590620aa636276a067cbe9d8997f761aecb703304b3800ccf555c9f3dc64214b297f"
+        "b1966a3b6d83"
+    )
+
+
+def test_sign_eip1559_transaction():
+    tx = {
+        "chainId": 1,
+        "nonce": 0,
+        "maxPriorityFeePerGas": 10**9,
+        "maxFeePerGas": 2 * 10**9,
+        "gas": 21000,
+        "to": None,
+        "data": b"\x60\x00",
+    }
+    raw = sign_transaction(tx, KEY)
+    assert raw[0] == 2
+    # Deterministic (RFC 6979)
+    assert sign_transaction(tx, KEY) == raw
+
+
+def test_create_address():
+    assert (
+        create_address("0x6ac7ea33f8831ea9dcc53393aaa88b25a785dbf0", 0)
+        == "0xcd234A471b72ba2F1Ccf0A70FCABA648a5eeCD8d"
+    )
+    assert (
+        create_address("0x6ac7ea33f8831ea9dcc53393aaa88b25a785dbf0", 1)
+        == "0x343c43A37D37dfF08AE8C4A11544c718AbB4fCF8"
+    )
+
+
+@pytest.mark.parametrize(
+    "factory, salt, init_code, expected",
+    [
+        # EIP-1014 examples
+        ("0x" + "00" * 20, b"\0" * 32, b"\0", "0x4D1A2e2bB4F88F0250f26Ffff098B0b30B26BF38"),
+        (
+            "0xdeadbeef00000000000000000000000000000000",
+            b"\0" * 32,
+            b"\0",
+            "0xB928f69Bb1D91Cd65274e3c79d8986362984fDA3",
+        ),
+        (
+            "0xdeadbeef00000000000000000000000000000000",
+            bytes.fromhex("000000000000000000000000feed000000000000000000000000000000000000"),
+            b"\0",
+            "0xD04116cDd17beBE565EB2422F2497E06cC1C9833",
+        ),
+        ("0x" + "00" * 20, b"\0" * 32, b"", "0xE33C0C7F7df4809055C3ebA6c09CFe4BaF1BD9e0"),
+    ],
+)
+def test_create2_address(factory, salt, init_code, expected):
+    assert create2_address(factory, salt, init_code) == expected
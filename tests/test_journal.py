@@ -0,0 +1,71 @@
+import json, threading
+import pytest
+from foundrydeploy.journal import Journal
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "deploy.journal")
+
+
+def test_append_and_replay(path):
+    journal = Journal(path)
+    journal.append({"step": 0})
+    journal.append({"step": 1})
+    assert Journal(path).records() == [{"step": 0}, {"step": 1}]
+
+
+def test_missing_file(path):
+    assert Journal(path).records() == []
+    # Nothing to drop
+    Journal(path).compact()
+
+
+def test_concurrent_appends(path):
+    journal = Journal(path)
+    threads = [threading.Thread(target=journal.append, args=({"step": i},)) for i in range(32)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(record["step"] for record in Journal(path).records()) == list(range(32))
+
+
+def test_torn_tail_is_skipped(path):
+    with open(path, "w") as f:
+        f.write(json.dumps({"step": 0}) + "\n" + '{"step": 1, "lab')
+
+    assert Journal(path).records() == [{"step": 0}]
+
+
+def test_append_after_torn_tail(path):
+    with open(path, "w") as f:
+        f.write(json.dumps({"step": 0}) + "\n" + '{"step": 1, "lab')
+
+    journal = Journal(path)
+    journal.append({"step": 2})
+    journal.append({"step": 3})
+
+    # The torn line is dropped, so the next records are not glued to it
+    assert Journal(path).records() == [{"step": 0}, {"step": 2}, {"step": 3}]
+    with open(path) as f:
+        assert f.read().count("\n") == 3
+
+
+def test_torn_line_in_the_middle(path):
+    # Written by a version that appended right after a torn line
+    with open(path, "w") as f:
+        f.write(json.dumps({"step": 0}) + "\n" + '{"step": 1, "lab{"step": 2}\n' + json.dumps({"step": 3}) + "\n")
+
+    assert Journal(path).records() == [{"step": 0}, {"step": 3}]
+
+
+def test_compact(path):
+    journal = Journal(path)
+    journal.append({"step": 0})
+    journal.compact()
+    assert Journal(path).records() == []
+
+    journal.append({"step": 1})
+    assert Journal(path).records() == [{"step": 1}]
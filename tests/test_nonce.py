@@ -0,0 +1,86 @@
+import threading
+from foundrydeploy.nonce import NonceManager
+
+
+class Chain:
+    def __init__(self, nonce: int):
+        self.nonce = nonce
+        self.fetches = 0
+
+    def __call__(self) -> int:
+        self.fetches += 1
+        return self.nonce
+
+
+def test_allocate_fetches_once():
+    chain = Chain(5)
+    nonces = NonceManager(chain)
+    assert [nonces.allocate() for _ in range(3)] == [5, 6, 7]
+    assert chain.fetches == 1
+
+
+def test_allocate_from_threads():
+    nonces = NonceManager(Chain(0))
+    allocated = []
+    lock = threading.Lock()
+
+    def allocate():
+        for _ in range(100):
+            nonce = nonces.allocate()
+            with lock:
+                allocated.append(nonce)
+
+    threads = [threading.Thread(target=allocate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(allocated) == list(range(800))
+
+
+def test_release_last():
+    nonces = NonceManager(Chain(0))
+    assert [nonces.allocate(), nonces.allocate()] == [0, 1]
+
+    assert nonces.release(1) is False
+    assert nonces.take_gaps() == []
+    assert nonces.allocate() == 1
+
+
+def test_release_gap():
+    nonces = NonceManager(Chain(0))
+    assert [nonces.allocate() for _ in range(4)] == [0, 1, 2, 3]
+
+    assert nonces.release(2) is True
+    assert nonces.release(0) is True
+    # Released nonces are handed out again first, lowest first
+    assert nonces.allocate() == 0
+
+    assert nonces.take_gaps() == [2]
+    assert nonces.take_gaps() == []
+    assert nonces.allocate() == 4
+
+
+def test_resync():
+    chain = Chain(0)
+    nonces = NonceManager(chain)
+    assert [nonces.allocate() for _ in range(3)] == [0, 1, 2]
+    nonces.release(0)
+
+    # The key was used elsewhere: the chain is ahead, and nonce 0 is gone
+    chain.nonce = 10
+    assert nonces.resync() == 10
+    assert nonces.take_gaps() == []
+    assert nonces.allocate() == 10
+
+    # The chain is behind what was handed out (pending transactions): keep going
+    chain.nonce = 5
+    nonces.resync()
+    assert nonces.allocate() == 11
+
+
+def test_get_shares_managers():
+    first = NonceManager.get("http://node", "0xAbC", Chain(0))
+    assert NonceManager.get("http://node", "0xabc", Chain(7)) is first
+    assert NonceManager.get("http://other", "0xabc", Chain(7)) is not first